@@ -0,0 +1,147 @@
+from hashlib import sha256
+import pandas as pd
+import numpy as np
+import glob
+import os
+
+CACHE_DIR = ".cache"
+# Bump when the layout of cached arrays changes, e.g. in 'encode_frame'.
+VERSION = 1
+FRAME_PARTS = ["columns", "kinds", "ints", "floats", "codes", "strings"]
+
+
+def file_hash(*file_names):
+    """Returns a short hash of the contents of the files."""
+
+    digest = sha256()
+    for file_name in file_names:
+        with open(file_name, "rb") as f:
+            digest.update(f.read())
+
+    return digest.hexdigest()[:16]
+
+
+def array_hash(*arrays):
+    """Returns a short hash of the contents of the arrays."""
+
+    digest = sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.data)
+
+    return digest.hexdigest()[:16]
+
+
+def file_stamp(*file_names):
+    """Returns a short hash of the paths, sizes and mtimes of the files."""
+
+    digest = sha256()
+    for file_name in file_names:
+        stat = os.stat(file_name)
+        digest.update(f"{file_name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+
+    return digest.hexdigest()[:16]
+
+
+def load_arrays(names, key, build, mmap_mode="r"):
+    """Loads named, memory-mapped arrays from the cache.
+
+    On a cache miss the arrays are built by 'build', in the order of
+    'names', and saved under 'key' and 'VERSION'. Entries of the same names
+    with another key or version are removed, so a new key (e.g. a file
+    hash) replaces old entries. Arrays are mapped with 'mmap_mode', where
+    "c" maps them copy-on-write so that changes stay in memory.
+    """
+
+    file_names = [get_file_name(name, key) for name in names]
+    if not all(os.path.exists(file_name) for file_name in file_names):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        for (file_name, array) in zip(file_names, build()):
+            tmp_name = f"{file_name}.{os.getpid()}.tmp"
+            with open(tmp_name, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_name, file_name)
+        remove_stale(names, key)
+
+    return tuple(np.load(file_name, mmap_mode=mmap_mode) for file_name in file_names)
+
+
+def get_file_name(name, key):
+    return f"{CACHE_DIR}/{name}.{key}.v{VERSION}.npy"
+
+
+def remove_stale(names, key):
+    """Removes the entries of 'names' that are not saved under 'key'."""
+
+    for name in names:
+        current = get_file_name(name, key)
+        pattern = f"{CACHE_DIR}/{glob.escape(name)}.*.npy"
+        for file_name in glob.glob(pattern):
+            if file_name == current:
+                continue
+            try:
+                os.remove(file_name)
+            except OSError:
+                pass
+
+
+def load_frame(name, key, build):
+    """Loads a frame from columnar, memory-mapped arrays in the cache.
+
+    On a cache miss the frame is built by 'build' and encoded by
+    'encode_frame'. The arrays are mapped copy-on-write, so the frame can be
+    changed without changing the cache.
+    """
+
+    names = [f"{name}_{part}" for part in FRAME_PARTS]
+    arrays = load_arrays(names, key, lambda: encode_frame(build()), mmap_mode="c")
+
+    return decode_frame(*arrays)
+
+
+def encode_frame(frame):
+    """Encodes a frame as integer, float and dictionary-encoded string columns.
+
+    Columns are stored as rows of each array, so that every column is
+    contiguous.
+    """
+
+    kinds = []
+    for column in frame.columns:
+        dtype = frame[column].dtype
+        if pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+            kinds.append("i")
+        elif pd.api.types.is_float_dtype(dtype):
+            kinds.append("f")
+        else:
+            kinds.append("s")
+    kinds = np.array(kinds)
+    columns = frame.columns.to_numpy(dtype=str)
+
+    n = frame.shape[0]
+    ints = frame[columns[kinds == "i"]].to_numpy(dtype=np.int64).T.reshape((-1, n))
+    floats = frame[columns[kinds == "f"]].to_numpy(dtype=float).T.reshape((-1, n))
+    values = frame[columns[kinds == "s"]].to_numpy(dtype=str).T.reshape((-1, n))
+    strings, codes = np.unique(values, return_inverse=True)
+    codes = codes.astype(np.int32).reshape(values.shape)
+
+    return columns, kinds, ints, floats, codes, strings
+
+
+def decode_frame(columns, kinds, ints, floats, codes, strings):
+    """Decodes a frame encoded by 'encode_frame'.
+
+    Integer and float columns are views of the given arrays, which are not
+    copied.
+    """
+
+    sources = {"i": ints, "f": floats, "s": codes}
+    positions = {"i": 0, "f": 0, "s": 0}
+    data = {}
+    for (column, kind) in zip(columns.tolist(), kinds.tolist()):
+        values = sources[kind][positions[kind]]
+        positions[kind] += 1
+        data[column] = strings[values] if kind == "s" else values
+
+    return pd.DataFrame(data, copy=False)
@@ -1,6 +1,7 @@
 from getopt import getopt, GetoptError
 from scraper import PokemonScraper, Dex, Game
 import pandas as pd
+import type_chart
 import tools
 import sys
 
@@ -66,15 +67,27 @@ def load(game=Game.SWSH, dex=Dex.GALAR):
     return pokemon
 
 
+def check(game=Game.SWSH, dex=Dex.GALAR):
+    """Prints the pokemon whose scraped weaknesses differ from the type chart."""
+
+    file_name = f"pokemon/{game.value}/{dex.value}.csv"
+    pokemon = pd.read_csv(file_name, sep=",").fillna("")
+    mismatches = type_chart.check(pokemon)
+    print(f"Weakness mismatches: {mismatches.shape[0]}/{pokemon.shape[0]}")
+    if mismatches.shape[0] > 0:
+        print(mismatches["name"].tolist())
+
+
 def main(argv):
     short_options = "h"
-    long_options = ["help", "game=", "dex=", "workers="]
+    long_options = ["help", "game=", "dex=", "workers=", "check"]
     help_message = """usage: download.py [options]
     options:
         -h, --help          Prints help message.
         --game g            Downloads game 'g'. Default: 'SWSH'.
         --dex d             Downloads dex 'd'. Default: 'GALAR'.
-        --workers w         Uses 'w' workers. Default: None (cpu_count)."""
+        --workers w         Uses 'w' workers. Default: None (cpu_count).
+        --check             Checks saved weaknesses against the type chart."""
 
     try:
         opts, args = getopt(argv, shortopts=short_options, longopts=long_options)
@@ -85,6 +98,7 @@ def main(argv):
     game = Game.SWSH
     dex = Dex.GALAR
     workers = None
+    only_check = False
 
     for opt, arg in opts:
         if opt in ["-h", "--help"]:
@@ -96,6 +110,12 @@ def main(argv):
             dex = Dex[arg.upper()]
         elif opt == "--workers":
             workers = int(arg)
+        elif opt == "--check":
+            only_check = True
+
+    if only_check:
+        check(game=game, dex=dex)
+        return
 
     scraper = PokemonScraper()
     urls = scraper.get_urls(game=game, dex=dex)
@@ -111,6 +131,7 @@ def main(argv):
 
     # pokemon = load(dex=dex)
     save(pokemon, game=game, dex=dex)
+    check(game=game, dex=dex)
 
 
 if __name__ == "__main__":
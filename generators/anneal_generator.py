@@ -0,0 +1,156 @@
+from generators.generator import Generator
+from numpy.random import default_rng
+from pokemon_table import PokemonTable
+from sampling import AliasTable, draw_rows
+import numpy as np
+import tools
+import time
+
+BLOCK = 1024
+
+
+class AnnealGenerator(Generator):
+    def __init__(
+        self,
+        pokemon,
+        team_no=[],
+        size=6,
+        uteam=False,
+        weight=0.5,
+        moves=10000,
+        temp=0.01,
+        cooling="exp",
+        restarts=16,
+        seed=None,
+    ):
+        self.pokemon = pokemon
+        self.team_no = team_no
+        self.size = size - len(team_no)
+        self.uteam = uteam
+        self.weight = weight
+        self.moves = moves
+        self.temp = temp
+        self.cooling = cooling
+        self.restarts = restarts
+        self.team = []
+        self.rng = default_rng(seed)
+
+        if len(self.team_no) > 0:
+            self.team_idx = tools.no_to_idx(self.pokemon, self.team_no)
+        else:
+            self.team_idx = np.zeros((0,), dtype=int)
+
+        self.pokemon_table = PokemonTable(self.pokemon)
+        self.stat_totals, self.weak_totals = self.pokemon_table.get_totals()
+        self.team_stat = np.sum(self.stat_totals[self.team_idx])
+        self.team_weak = np.sum(self.weak_totals[self.team_idx])
+        self.n_team = len(self.team_idx) + self.size
+        self.fixed = np.zeros(self.stat_totals.shape, dtype=bool)
+        self.fixed[self.team_idx] = True
+
+    def generate(self):
+        """Runs simulated annealing with one chain per restart.
+
+        Each move swaps one member of every chain and updates the summed
+        stats and weaknesses of the team, so a move costs O(1) per chain.
+        """
+
+        self.team = []
+        if self.size <= 0 or len(self.stat_totals) <= 0:
+            self.team = self._get_team(np.zeros((0,), dtype=int))
+            return self.team
+
+        start = time.perf_counter()
+        best_team, best_fit = self._anneal()
+        elapsed = time.perf_counter() - start
+
+        moves = self.moves * self.restarts
+        print(f"Moves: {moves} in {elapsed:.2f}s ({moves / elapsed:.0f} moves/s)")
+        print(f"Best: {best_fit:.2f}")
+
+        self.team = self._get_team(best_team)
+
+        return self.team
+
+    def _anneal(self):
+        """Anneals all chains and returns the best team found."""
+
+        n = len(self.stat_totals)
+        chains = self.restarts
+        rows = np.arange(chains)
+
+        teams = self._population()
+        stat_total = self.team_stat + np.sum(self.stat_totals[teams], axis=1)
+        weak_total = self.team_weak + np.sum(self.weak_totals[teams], axis=1)
+        fit = tools.score(stat_total, weak_total, self.n_team, weight=self.weight)
+        best_teams = teams.copy()
+        best_fit = fit.copy()
+
+        for block in range(0, self.moves, BLOCK):
+            steps = min(BLOCK, self.moves - block)
+            slots = self.rng.integers(self.size, size=(steps, chains))
+            candidates = self.rng.integers(n, size=(steps, chains))
+            draws = self.rng.random((steps, chains))
+            temps = self._temperatures(block, steps)
+
+            for step in range(steps):
+                slot = slots[step]
+                new = candidates[step]
+                old = teams[rows, slot]
+
+                new_stat = stat_total + self.stat_totals[new] - self.stat_totals[old]
+                new_weak = weak_total + self.weak_totals[new] - self.weak_totals[old]
+                new_fit = tools.score(
+                    new_stat, new_weak, self.n_team, weight=self.weight
+                )
+
+                delta = np.minimum((new_fit - fit) / temps[step], 0)
+                accept = draws[step] < np.exp(delta)
+                if self.uteam:
+                    accept &= ~self.fixed[new]
+                    accept &= ~np.any(teams == new.reshape((-1, 1)), axis=1)
+
+                teams[rows[accept], slot[accept]] = new[accept]
+                stat_total = np.where(accept, new_stat, stat_total)
+                weak_total = np.where(accept, new_weak, weak_total)
+                fit = np.where(accept, new_fit, fit)
+
+                better = fit > best_fit
+                best_teams[better] = teams[better]
+                best_fit[better] = fit[better]
+
+        best = np.argmax(best_fit)
+
+        return best_teams[best], best_fit[best]
+
+    def _temperatures(self, block, steps):
+        """Returns the temperatures of a block of moves."""
+
+        t = (block + np.arange(steps)) / max(self.moves, 1)
+        if self.cooling == "linear":
+            temps = self.temp * (1 - t)
+        elif self.cooling == "log":
+            temps = self.temp / np.log(np.e + block + np.arange(steps))
+        else:
+            temps = self.temp * 0.001**t
+
+        return np.maximum(temps, 1e-12)
+
+    def _population(self):
+        """Creates one random team per chain."""
+
+        n = len(self.stat_totals)
+        size = (self.restarts, self.size)
+        if not self.uteam:
+            return self.rng.integers(n, size=size)
+
+        table = AliasTable(np.ones((n,)))
+
+        return draw_rows(self.rng, table, self.restarts, self.size, self.fixed)
+
+    def _get_team(self, team):
+        """Converts team indices to pokemon."""
+
+        team_idx = np.concatenate((self.team_idx, team))
+
+        return self.pokemon_table.team(team_idx)
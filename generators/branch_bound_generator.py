@@ -0,0 +1,169 @@
+from generators.generator import Generator
+from pokemon_table import PokemonTable
+import numpy as np
+import type_chart
+import tools
+
+
+class BranchBoundGenerator(Generator):
+    def __init__(
+        self,
+        pokemon,
+        team_no=[],
+        size=6,
+        utypes=False,
+        uteam=False,
+        weight=0.5,
+        coverage=0.0,
+    ):
+        self.pokemon = pokemon
+        self.team_no = team_no
+        self.size = size - len(team_no)
+        self.utypes = utypes
+        self.uteam = uteam
+        self.weight = weight
+        self.coverage = coverage
+        self.team = []
+        self.nodes = 0
+        self.pruned = 0
+
+        if len(self.team_no) > 0:
+            self.team_idx = tools.no_to_idx(self.pokemon, self.team_no)
+        else:
+            self.team_idx = np.zeros((0,), dtype=int)
+
+        self.pokemon_table = PokemonTable(self.pokemon)
+        self.stat_totals, self.weak_totals = self.pokemon_table.get_totals()
+        self.n_team = len(self.team_idx) + self.size
+        self.scores = tools.contributions(
+            self.stat_totals, self.weak_totals, self.n_team, weight=self.weight
+        )
+
+        type_1 = self.pokemon["type_1"]
+        type_2 = self.pokemon["type_2"]
+        self.types = type_chart.pair_codes(type_1, type_2)
+
+    def generate(self):
+        """Searches for the best team that satisfies the constraints."""
+
+        self.team = []
+        self.nodes = 0
+        self.pruned = 0
+
+        if not tools.below_caps(self.stat_totals, self.weak_totals, self.n_team):
+            print("Warning: Score caps can be reached, team may not be optimal.")
+        if self.coverage > 0:
+            print("Warning: Type coverage is ignored, team may not be optimal.")
+
+        best = self._search()
+        print(f"Nodes: {self.nodes} explored, {self.pruned} pruned")
+
+        team_idx = np.concatenate((self.team_idx, best)).astype(int)
+        self.team = self.pokemon_table.team(team_idx)
+
+        return self.team
+
+    def _search(self):
+        """Prepares the candidates and runs a depth-first branch and bound."""
+
+        allowed = np.ones(self.scores.shape, dtype=bool)
+        if self.uteam:
+            allowed[self.team_idx] = False
+        if self.utypes:
+            allowed &= ~np.isin(self.types, self.types[self.team_idx])
+
+        order = np.argsort(-self.scores, kind="stable")
+        order = order[allowed[order]]
+        self.candidates = order
+        self.candidate_scores = self.scores[order].tolist()
+        self.candidate_types = self.types[order].tolist()
+        self.prefix = np.concatenate(([0], np.cumsum(self.scores[order]))).tolist()
+        self.leaders = {}
+
+        n = len(self.candidates)
+        if self.utypes:
+            n = len(np.unique(self.types[order]))
+        elif not self.uteam and n > 0:
+            n = self.size
+        self.k = min(self.size, n)
+
+        self.best_value = -np.inf
+        self.best_team = []
+        self._branch(0, [], set(), 0)
+
+        return self.candidates[self.best_team]
+
+    def _branch(self, start, team, used, value):
+        """Extends a partial team with candidates from 'start' onwards."""
+
+        self.nodes += 1
+        depth = len(team)
+        if depth >= self.k:
+            if value > self.best_value:
+                self.best_value = value
+                self.best_team = list(team)
+            return
+
+        remaining = self.k - depth
+        unique = self.uteam or self.utypes
+        for j in range(start, len(self.candidate_scores)):
+            t = self.candidate_types[j]
+            if self.utypes and t in used:
+                continue
+            # Bounds never increase with 'j', so all later candidates are
+            # pruned as well.
+            if value + self._bound(j, remaining, used) <= self.best_value:
+                self.pruned += 1
+                break
+
+            team.append(j)
+            if self.utypes:
+                used.add(t)
+            score = self.candidate_scores[j]
+            self._branch(j + 1 if unique else j, team, used, value + score)
+            team.pop()
+            if self.utypes:
+                used.discard(t)
+
+    def _leaders(self, j):
+        """Returns the type pairs and best scores from candidate 'j' onwards.
+
+        Candidates are sorted by score, so the first candidate of each type
+        pair is the best of that pair. Pairs are returned best first and
+        kept for later calls from the same candidate.
+        """
+
+        leaders = self.leaders.get(j)
+        if leaders is None:
+            types = self.types[self.candidates[j:]]
+            _, first = np.unique(types, return_index=True)
+            first = np.sort(first)
+            scores = self.scores[self.candidates[j:]]
+            leaders = (types[first].tolist(), scores[first].tolist())
+            self.leaders[j] = leaders
+
+        return leaders
+
+    def _bound(self, j, remaining, used):
+        """Returns an upper bound for 'remaining' members from candidate 'j'."""
+
+        score = self.candidate_scores[j]
+        if self.utypes:
+            # The best unused type pairs are at most 'used' entries into the
+            # leaders of 'j'.
+            bound = 0
+            for (t, best) in zip(*self._leaders(j)):
+                if remaining <= 0:
+                    break
+                if t in used:
+                    continue
+                bound += best
+                remaining -= 1
+            return bound if remaining <= 0 else -np.inf
+        elif self.uteam:
+            end = j + remaining
+            if end >= len(self.prefix):
+                return -np.inf
+            return self.prefix[end] - self.prefix[j]
+        else:
+            return remaining * score
@@ -0,0 +1,71 @@
+from generators.generator import Generator
+from pokemon_table import PokemonTable
+import numpy as np
+import tools
+
+
+class ExactGenerator(Generator):
+    def __init__(self, pokemon, team_no=[], size=6, uteam=False, weight=0.5):
+        self.pokemon = pokemon
+        self.team_no = team_no
+        self.size = size - len(team_no)
+        self.uteam = uteam
+        self.weight = weight
+        self.team = []
+
+        if len(self.team_no) > 0:
+            self.team_idx = tools.no_to_idx(self.pokemon, self.team_no)
+        else:
+            self.team_idx = np.zeros((0,), dtype=int)
+
+        self.pokemon_table = PokemonTable(self.pokemon)
+        self.stat_totals, self.weak_totals = self.pokemon_table.get_totals()
+        self.n_team = len(self.team_idx) + self.size
+        self.scores = tools.contributions(
+            self.stat_totals, self.weak_totals, self.n_team, weight=self.weight
+        )
+
+    def generate(self):
+        """Selects the best team."""
+
+        if not self.is_exact():
+            print("Warning: Score caps can be reached, team may not be optimal.")
+
+        team_idx = np.concatenate((self.team_idx, self._best()))
+        self.team = self.pokemon_table.team(team_idx)
+
+        return self.team
+
+    def optimum(self):
+        """Returns the fitness of the best team."""
+
+        team_idx = np.concatenate((self.team_idx, self._best()))
+        stat_total = np.sum(self.stat_totals[team_idx])
+        weak_total = np.sum(self.weak_totals[team_idx])
+
+        return tools.score(stat_total, weak_total, self.n_team, weight=self.weight)
+
+    def is_exact(self):
+        """Checks that no team can reach the score caps in 'tools.score'."""
+
+        return tools.below_caps(self.stat_totals, self.weak_totals, self.n_team)
+
+    def _best(self):
+        """Returns the best team members by a top-k selection."""
+
+        scores = self.scores
+        k = self.size
+        if k <= 0 or len(scores) <= 0:
+            return np.zeros((0,), dtype=int)
+        if not self.uteam:
+            return np.full((k,), np.argmax(scores))
+
+        scores = scores.copy()
+        scores[self.team_idx] = -np.inf
+        k = min(k, len(scores) - len(np.unique(self.team_idx)))
+        if k <= 0:
+            return np.zeros((0,), dtype=int)
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+
+        return best
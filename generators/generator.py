@@ -1,3 +1,4 @@
+from numpy.random import default_rng
 from abc import abstractmethod
 from enum import Enum
 
@@ -7,8 +8,18 @@ class Generator:
     def generate(self):
         raise NotImplementedError
 
+    def reseed(self, seed):
+        """Restarts the random number generator from 'seed'."""
+
+        self.rng = default_rng(seed)
+
 
 class GeneratorType(Enum):
     NAIVE = "naive"
     RANDOM = "random"
     GENETIC = "genetic"
+    GENETIC_ISLANDS = "genetic-islands"
+    EXACT = "exact"
+    BRANCH_BOUND = "branch-bound"
+    NSGA = "nsga"
+    ANNEAL = "anneal"
@@ -1,7 +1,11 @@
 from generators.generator import Generator
 from numpy.random import default_rng
+from pokemon_table import PokemonTable
+from sampling import AliasTable, draw_rows
 import numpy as np
+import type_coverage
 import tools
+import time
 
 
 class GeneticGenerator(Generator):
@@ -17,6 +21,9 @@ class GeneticGenerator(Generator):
         teams=100,
         cross=2,
         mut=3,
+        time_limit=None,
+        patience=None,
+        coverage=0.0,
         seed=None,
     ):
         self.pokemon = pokemon
@@ -29,13 +36,27 @@ class GeneticGenerator(Generator):
         self.teams = teams
         self.cross = cross
         self.mut = mut
+        self.time_limit = time_limit
+        self.patience = patience
+        self.coverage = coverage
         self.team = []
         self.rng = default_rng(seed)
 
         if len(self.team_no) > 0:
             self.team_idx = tools.no_to_idx(self.pokemon, self.team_no)
         else:
-            self.team_idx = []
+            self.team_idx = np.zeros((0,), dtype=int)
+
+        self.names = self.pokemon["name"].to_numpy()
+        self.pokemon_table = PokemonTable(self.pokemon)
+        self.stat_totals, self.weak_totals = self.pokemon_table.get_totals()
+        self.table = AliasTable(np.ones(self.stat_totals.shape))
+        self.team_stat = np.sum(self.stat_totals[self.team_idx])
+        self.team_weak = np.sum(self.weak_totals[self.team_idx])
+        self.scores = self._individual_fitness()
+        self.resists = type_coverage.TypeCoverage(self.pokemon).resists
+        self.team_resists = np.bitwise_or.reduce(self.resists[self.team_idx])
+        self.n_team = len(self.team_idx) + self.size
 
     def generate(self):
         """Runs simulation."""
@@ -46,37 +67,61 @@ class GeneticGenerator(Generator):
         fit = self._fitness(teams)
         best = np.argmax(fit)
         best_fit = fit[best]
-        prev_fit = best_fit
         team_idx = np.concatenate((self.team_idx, teams[best]))
-        best_team = self.pokemon.iloc[team_idx, :]["name"].to_numpy()
-        prev_team = best_team
-        initial = fit[best]
+        best_team = self.names[team_idx]
+        initial = best_fit
+        top_fit = best_fit
+        top_team = teams[best].copy()
+        stale = 0
+        start = time.perf_counter()
 
         evolving = True
         gen = 0
         while evolving:
+            prev_fit = best_fit
+            prev_team = best_team
+            teams = self._evolve(teams, fit)
             fit = self._fitness(teams)
             best = np.argmax(fit)
             best_fit = fit[best]
+            # The generation just produced is compared, so the last
+            # generation counts as well.
+            if best_fit > top_fit:
+                top_fit = best_fit
+                top_team = teams[best].copy()
+                stale = 0
+            else:
+                stale += 1
             team_idx = np.concatenate((self.team_idx, teams[best]))
-            best_team = self.pokemon.iloc[team_idx, :]["name"].to_numpy()
+            best_team = self.names[team_idx]
             self._progress(prev_fit, prev_team, best_fit, best_team)
-            prev_fit = best_fit
-            prev_team = best_team
-            teams = self._evolve(teams)
             gen += 1
-            evolving = gen < self.gens
+            evolving = gen < self.gens and not self._stop(start, stale)
 
-        self._summary(initial, best_fit)
-
-        team_idx = np.concatenate((self.team_idx, teams[best]))
-        pkmns = self.pokemon.iloc[team_idx, :]
-        rows = pkmns.shape[0]
-        for row in range(rows):
-            self.team.append(tools.frame_to_pokemon(pkmns.iloc[row, :]))
+        self._summary(initial, top_fit)
+        self.team = self._get_team(top_team)
 
         return self.team
 
+    def _stop(self, start, stale):
+        """Checks if the time limit or patience has been reached."""
+
+        if self.time_limit is not None:
+            if time.perf_counter() - start >= self.time_limit:
+                return True
+        if self.patience is not None:
+            if stale >= self.patience:
+                return True
+
+        return False
+
+    def _get_team(self, team):
+        """Converts team indices to pokemon."""
+
+        team_idx = np.concatenate((self.team_idx, team))
+
+        return self.pokemon_table.team(team_idx)
+
     def _progress(self, prev, prev_team, best, best_team):
         """Prints progress."""
 
@@ -99,21 +144,20 @@ class GeneticGenerator(Generator):
         """Creates a team population."""
 
         teams = None
-        n = self.pokemon.shape[0]
+        n = len(self.stat_totals)
         size = (self.teams, self.size)
         if self.uteam:
-            teams = np.zeros(size)
-            for row in range(size[0]):
-                teams[row, :] = self.rng.choice(n, size=size[1], replace=False)
+            teams = np.zeros((self.teams, 0), dtype=int)
+            teams = self._get_unique(teams, self.size)
         else:
             teams = self.rng.choice(n, size=size, replace=True)
 
         return teams
 
-    def _evolve(self, teams):
-        """Evolves a team population."""
+    def _evolve(self, teams, fit):
+        """Evolves a team population with fitness 'fit'."""
 
-        sel = self._select(teams)
+        sel = self._select(teams, fit)
         evo = self._crossover(sel)
         evo = self._mutate(evo)
 
@@ -123,18 +167,17 @@ class GeneticGenerator(Generator):
         if n_rest <= 0:
             return evo
 
-        fit = self._fitness(teams)
         idx = np.argsort(fit)[::-1][:n_rest]
         best = teams[idx, :]
         evol = np.concatenate((best, evo), axis=0)
 
         return evol
 
-    def _select(self, teams):
-        """Selects a team subpopulation."""
+    def _select(self, teams, fit):
+        """Selects a team subpopulation with fitness 'fit'."""
 
         n = teams.shape[0]
-        fit = self._fitness(teams)
+        fit = fit.copy()
         fit_sum = np.sum(fit)
         min_fit = np.amin(fit_sum)
         if min_fit < 0:
@@ -148,7 +191,7 @@ class GeneticGenerator(Generator):
 
         cols = teams.shape[1]
         sel_size = (rows, cols, self.cross)
-        sel = np.zeros(sel_size)
+        sel = np.zeros(sel_size, dtype=int)
         for col in range(self.cross):
             teams_idx = idx[:, col]
             sel[:, :, col] = teams[teams_idx, :]
@@ -158,45 +201,20 @@ class GeneticGenerator(Generator):
     def _fitness(self, teams):
         """Evaluates fitness for a team population."""
 
-        rows = teams.shape[0]
-        fit = np.zeros((rows,))
-        for row in range(rows):
-            team_idx = teams[row, :]
-            team_idx = np.concatenate((self.team_idx, team_idx))
-            team = self.pokemon.iloc[team_idx, :]
-
-            stats = team.iloc[:, tools.STAT_COLS].to_numpy(dtype=float)
-            weaknesses = team.iloc[:, tools.WEAK_COLS].to_numpy(dtype=float)
-
-            n_team = team.shape[0]
-            stat_score = np.mean(np.sum(stats, axis=0))
-            weak_score = np.sum(np.sum(weaknesses, axis=0)) / n_team
-            stat_score = (stat_score - tools.MIN_STAT) / tools.MAX_STAT
-            weak_score = (weak_score - tools.MIN_WEAK) / tools.MAX_WEAK
-
-            stat_score = np.minimum(stat_score, 1)
-            weak_score = np.minimum(weak_score, 1)
-
-            weak_score = 1 - weak_score
-            fit[row] = self.weight * stat_score + (1 - self.weight) * weak_score
+        stat_total = self.team_stat + np.sum(self.stat_totals[teams], axis=1)
+        weak_total = self.team_weak + np.sum(self.weak_totals[teams], axis=1)
+        fit = tools.score(stat_total, weak_total, self.n_team, weight=self.weight)
+        if self.coverage > 0:
+            covered = type_coverage.score(self.resists, teams, base=self.team_resists)
+            fit = (1 - self.coverage) * fit + self.coverage * covered
 
         return fit
 
-    def _individual_fitness(self, team):
-        """Evaluates fitness for team members."""
-
-        team_idx = team
-        team_idx = np.concatenate((self.team_idx, team_idx))
-        team = self.pokemon.iloc[team_idx, :]
+    def _individual_fitness(self):
+        """Evaluates fitness for each pokemon."""
 
-        stats = team.iloc[:, tools.STAT_COLS].to_numpy(dtype=float)
-        weaknesses = team.iloc[:, tools.WEAK_COLS].to_numpy(dtype=float)
-
-        stat_scores = np.sum(stats, axis=1)
-        weak_scores = np.sum(weaknesses, axis=1)
-
-        stat_scores = (stat_scores - tools.MIN_STAT) / tools.MAX_STAT
-        weak_scores = (weak_scores - tools.MIN_WEAK) / tools.MAX_WEAK
+        stat_scores = (self.stat_totals - tools.MIN_STAT) / tools.MAX_STAT
+        weak_scores = (self.weak_totals - tools.MIN_WEAK) / tools.MAX_WEAK
 
         stat_scores = np.minimum(stat_scores, 1)
         weak_scores = np.minimum(weak_scores, 1)
@@ -207,52 +225,62 @@ class GeneticGenerator(Generator):
         return fit
 
     def _crossover(self, sel):
-        """Crosses a team population."""
+        """Crosses a team population.
+
+        Each crossed team keeps the best members of its parents. With 'uteam'
+        repeated members are ranked last so that the best distinct members
+        are kept.
+        """
 
         rows = sel.shape[0]
         cols = sel.shape[1]
         cross = sel.shape[2]
-        teams = np.zeros((rows, cols))
-
-        for row in range(rows):
-            total_size = (cols * cross,)
-            pokemon = sel[row, :, :].reshape(total_size, order="F")
-            old = pokemon
-            if self.uteam:
-                pokemon = np.unique(pokemon)
-            pokemon_fit = self._individual_fitness(pokemon)
-            pokemon_best = np.argsort(pokemon_fit)[::-1][:cols]
-            teams[row, :] = pokemon_best
+
+        pokemon = sel.transpose(0, 2, 1).reshape((rows, cols * cross))
+        if self.uteam:
+            pokemon = np.sort(pokemon, axis=1)
+        pokemon_fit = self.scores[pokemon]
+        if self.uteam:
+            repeated = pokemon[:, 1:] == pokemon[:, :-1]
+            pokemon_fit[:, 1:][repeated] = -np.inf
+
+        pokemon_best = np.argpartition(-pokemon_fit, cols - 1, axis=1)[:, :cols]
+        teams = np.take_along_axis(pokemon, pokemon_best, axis=1)
 
         return teams
 
     def _mutate(self, teams):
         """Mutates a team population."""
 
-        n = self.pokemon.shape[0]
+        n = len(self.stat_totals)
         n_teams = teams.shape[0]
         n_team = teams.shape[1]
-        size = (n_teams, self.mut)
+        n_mut = self.mut
+        if self.uteam:
+            n_mut = min(n_mut, n - n_team - len(self.team_idx))
+        if n_mut <= 0 or n_team <= 0:
+            return teams
+
+        size = (n_teams, n_mut)
         replace_idx = self.rng.choice(n_team, size=size, replace=True)
 
         if self.uteam:
-            for row in range(n_teams):
-                new_idx = self._get_unique(teams[row, :], n, size)
-                teams[row, replace_idx[row]] = new_idx
+            new_idx = self._get_unique(teams, n_mut)
         else:
             new_idx = self.rng.choice(n, size=size, replace=True)
-            for row in range(n_teams):
-                teams[row, replace_idx[row]] = new_idx[row]
+        rows = np.arange(n_teams).reshape((-1, 1))
+        teams[rows, replace_idx] = new_idx
 
         return teams
 
-    def _get_unique(self, team, n, size):
-        """Returns unique pokemon indices."""
+    def _get_unique(self, teams, k):
+        """Returns 'k' unique pokemon indices per team that are not in the team."""
+
+        n_teams = teams.shape[0]
+        if k <= 0:
+            return np.zeros((n_teams, 0), dtype=int)
 
-        unique = True
-        new_idx = None
-        while unique:
-            new_idx = self.rng.choice(n, size=size[1], replace=False)
-            unique = np.sum(np.isin(new_idx, team))
+        forbidden = np.zeros((len(self.table),), dtype=bool)
+        forbidden[self.team_idx] = True
 
-        return new_idx
+        return draw_rows(self.rng, self.table, n_teams, k, forbidden, members=teams)
@@ -0,0 +1,225 @@
+from generators.genetic_generator import GeneticGenerator
+from multiprocessing import shared_memory, cpu_count, Pipe, Process
+from numpy.random import SeedSequence, default_rng
+import numpy as np
+import copy
+import time
+
+SHARED = None
+
+
+def _attach(name, shape):
+    """Attaches a worker to the shared pokemon arrays."""
+
+    global SHARED
+    shm = shared_memory.SharedMemory(name=name)
+    totals = np.ndarray(shape, dtype=float, buffer=shm.buf)
+    totals.flags.writeable = False
+    SHARED = (shm, totals)
+
+
+def _run_island(conn, name, shape, island, teams):
+    """Keeps an island population in a worker and evolves it on request.
+
+    A number of generations evolves the population and a team replaces its
+    worst team. Both are answered with the best team of the population,
+    and None stops the worker.
+    """
+
+    _attach(name, shape)
+    totals = SHARED[1]
+    island.stat_totals = totals[0]
+    island.weak_totals = totals[1]
+    island.scores = totals[2]
+    island.resists = totals[3].astype(np.int64)
+
+    fit = island._fitness(teams)
+    try:
+        while True:
+            best = np.argmax(fit)
+            conn.send((teams[best].copy(), fit[best]))
+            message = conn.recv()
+            if message is None:
+                break
+            elif isinstance(message, int):
+                for _ in range(message):
+                    teams = island._evolve(teams, fit)
+                    fit = island._fitness(teams)
+            else:
+                teams[np.argmin(fit), :] = message
+                fit = island._fitness(teams)
+    finally:
+        conn.close()
+
+
+class IslandGenerator(GeneticGenerator):
+    def __init__(
+        self,
+        pokemon,
+        team_no=[],
+        size=6,
+        uteam=False,
+        weight=0.5,
+        gens=10,
+        prop=0.8,
+        teams=100,
+        cross=2,
+        mut=3,
+        time_limit=None,
+        patience=None,
+        coverage=0.0,
+        islands=None,
+        migrate=5,
+        seed=None,
+    ):
+        super().__init__(
+            pokemon,
+            team_no=team_no,
+            size=size,
+            uteam=uteam,
+            weight=weight,
+            gens=gens,
+            prop=prop,
+            teams=teams,
+            cross=cross,
+            mut=mut,
+            time_limit=time_limit,
+            patience=patience,
+            coverage=coverage,
+            seed=seed,
+        )
+        self.islands = cpu_count() if islands is None else islands
+        self.migrate = migrate
+        self.reseed(seed)
+
+    def reseed(self, seed):
+        """Restarts the random number generators of all islands from 'seed'."""
+
+        super().reseed(seed)
+        if not isinstance(seed, SeedSequence):
+            seed = SeedSequence(seed)
+        self.seeds = seed.spawn(self.islands)
+
+    def generate(self):
+        """Runs simulation on a process pool with one population per island."""
+
+        self.team = []
+
+        totals = (self.stat_totals, self.weak_totals, self.scores, self.resists)
+        totals = np.stack(totals).astype(float)
+        shm = shared_memory.SharedMemory(create=True, size=totals.nbytes)
+        try:
+            shared = np.ndarray(totals.shape, dtype=float, buffer=shm.buf)
+            shared[:] = totals
+            best_team, initial, best_fit = self._run(shm.name, totals.shape)
+        finally:
+            shm.close()
+            shm.unlink()
+
+        self._summary(initial, best_fit)
+        self.team = self._get_team(best_team)
+
+        return self.team
+
+    def _run(self, name, shape):
+        """Evolves all islands and migrates their best teams.
+
+        Each island lives in its own worker for the whole run, so only
+        generation counts and migrants are sent between processes.
+        """
+
+        conns = []
+        workers = []
+        try:
+            for seed in self.seeds:
+                island, teams = self._island(seed)
+                conn, child = Pipe()
+                worker = Process(
+                    target=_run_island,
+                    args=(child, name, shape, island, teams),
+                    daemon=True,
+                )
+                worker.start()
+                child.close()
+                conns.append(conn)
+                workers.append(worker)
+
+            return self._evolve_islands(conns)
+        finally:
+            for conn in conns:
+                try:
+                    conn.send(None)
+                except OSError:
+                    pass
+                conn.close()
+            for worker in workers:
+                worker.join()
+
+    def _evolve_islands(self, conns):
+        """Evolves the islands behind 'conns' until the search stops."""
+
+        bests = [conn.recv() for conn in conns]
+        best_team, best_fit = self._best(bests)
+        initial = best_fit
+        prev_fit = best_fit
+        prev_team = self.names[np.concatenate((self.team_idx, best_team))]
+        stale = 0
+        start = time.perf_counter()
+
+        gen = 0
+        evolving = gen < self.gens
+        while evolving:
+            gens = min(self.migrate, self.gens - gen)
+            for conn in conns:
+                conn.send(gens)
+            bests = [conn.recv() for conn in conns]
+            gen += gens
+
+            # The worst team of each island is replaced by the best team of
+            # the previous island.
+            for (i, conn) in enumerate(conns):
+                conn.send(bests[i - 1][0])
+            bests = [conn.recv() for conn in conns]
+            team, fit = self._best(bests)
+            if fit > best_fit:
+                best_team, best_fit = team, fit
+                stale = 0
+            else:
+                stale += gens
+            team = self.names[np.concatenate((self.team_idx, best_team))]
+            self._progress(prev_fit, prev_team, best_fit, team)
+            prev_fit = best_fit
+            prev_team = team
+            evolving = gen < self.gens and not self._stop(start, stale)
+
+        return best_team, initial, best_fit
+
+    def _island(self, seed):
+        """Creates a lightweight island generator and its population.
+
+        The pokemon frame, totals, scores and type resistances are left out
+        of the island so that they are not pickled; the workers read them
+        from shared memory.
+        """
+
+        island = copy.copy(self)
+        island.rng = default_rng(seed)
+        teams = island._population()
+
+        island.pokemon = None
+        island.pokemon_table = None
+        island.names = None
+        island.stat_totals = None
+        island.weak_totals = None
+        island.scores = None
+        island.resists = None
+        island.seeds = None
+
+        return island, teams
+
+    def _best(self, bests):
+        """Returns the best of the islands' best teams."""
+
+        i = int(np.argmax([fit for (_, fit) in bests]))
+
+        return bests[i]
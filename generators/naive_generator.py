@@ -1,19 +1,33 @@
 from generators.generator import Generator
+from pokemon_table import PokemonTable
 import pandas as pd
 import numpy as np
+import type_coverage
+import type_chart
 import tools
 
 
 class NaiveGenerator(Generator):
     def __init__(
-        self, pokemon, team_no=[], size=6, weights=None, utypes=False, uteam=False
+        self,
+        pokemon,
+        team_no=[],
+        size=6,
+        weights=None,
+        utypes=False,
+        uteam=False,
+        coverage=0.0,
+        chart=None,
     ):
         self.pokemon = pokemon
         self.team_no = team_no
         self.size = size
         self.utypes = utypes
         self.uteam = uteam
+        self.coverage = coverage
+        self.chart = chart
         self.team = []
+        self.pokemon_table = PokemonTable(self.pokemon)
 
         stats = self.pokemon.columns[tools.STAT_COLS]
         if weights is None:
@@ -21,7 +35,12 @@ class NaiveGenerator(Generator):
         self.weights = pd.DataFrame(weights, columns=stats)
 
     def generate(self):
+        type_1 = self.pokemon["type_1"]
+        type_2 = self.pokemon["type_2"]
+        self.codes = type_chart.pair_codes(type_1, type_2)
         weaknesses, types = self._generate_weakness_chart()
+        self.resists = type_coverage.to_bits(weaknesses.T < 1)
+        self.index = self._generate_index()
         team_types = self._get_team_types()
         team_types = self._generate_team_types(weaknesses, types, team=team_types)
         self.team = self._get_team(team_types)
@@ -29,34 +48,52 @@ class NaiveGenerator(Generator):
         return self.team
 
     def _generate_weakness_chart(self):
-        types = tools.get_types(self.pokemon)
-        indices = {}
-        weaknesses = []
-        for (i, t) in enumerate(types):
-            type_1 = t[0]
-            type_2 = t[1]
-            fltr = np.logical_and(
-                self.pokemon["type_1"] == type_1, self.pokemon["type_2"] == type_2
-            )
-            pkmn = self.pokemon.loc[fltr].head(1).to_numpy()
-            weaknesses.append(pkmn[:, tools.WEAK_COLS].reshape(-1,))
-            indices[t] = i
-
-        all_types = self.pokemon.columns[tools.WEAK_COLS]
-        weaknesses = np.asmatrix(weaknesses)
-        multi_index = pd.MultiIndex.from_tuples(types)
-        weaknesses = pd.DataFrame(weaknesses, index=multi_index, columns=all_types)
+        """Returns the weaknesses of the type pairs in 'pokemon'.
+
+        A precomputed 'chart' of (pairs, weaknesses) is restricted to the
+        pairs that are present.
+        """
+
+        if self.chart is None:
+            pairs, weaknesses = tools.get_type_chart(self.pokemon)
+        else:
+            pairs, weaknesses = self.chart
+            keys = type_chart.pair_codes(pairs[:, 0], pairs[:, 1])
+            present = np.isin(keys, self.codes)
+            pairs = pairs[present]
+            weaknesses = weaknesses[present]
+
+        pairs = np.array(pairs, dtype=str).reshape((-1, 2))
+        self.all_types = type_chart.to_codes(self.pokemon.columns[tools.WEAK_COLS])
+        self.pair_types = np.stack(
+            (type_chart.to_codes(pairs[:, 0]), type_chart.to_codes(pairs[:, 1])), axis=1
+        )
+        weaknesses = np.array(weaknesses, dtype=float)
+        types = type_chart.pair_codes(pairs[:, 0], pairs[:, 1]).tolist()
 
         return weaknesses, types
 
+    def _generate_index(self):
+        """Maps each type pair to its pokemon rows, best weighted stats first."""
+
+        stats = self.pokemon.iloc[:, tools.STAT_COLS].to_numpy(dtype=float)
+        weighted = stats @ self.weights.to_numpy(dtype=float).reshape((-1,))
+        codes, uniques = pd.factorize(self.codes)
+
+        order = np.argsort(-weighted, kind="stable")
+        order = order[np.argsort(codes[order], kind="stable")]
+        counts = np.bincount(codes, minlength=len(uniques))
+        rows = np.split(order, np.cumsum(counts)[:-1])
+
+        return dict(zip(uniques.tolist(), rows))
+
     def _get_team_types(self):
         team_types = []
         for no in self.team_no:
-            pkmn = self.pokemon[self.pokemon["no"] == no]
-            if pkmn.empty:
+            rows = np.flatnonzero(self.pokemon_table.no == no)
+            if len(rows) <= 0:
                 continue
-            pkmn = pkmn.head(1)
-            team_types.append(*zip(pkmn["type_1"], pkmn["type_2"]))
+            team_types.append(int(self.codes[rows[0]]))
 
         return team_types
 
@@ -66,15 +103,18 @@ class NaiveGenerator(Generator):
         weaknesses *= 2
         chart = weaknesses
         split = len(team)
+        indices = {t: i for (i, t) in enumerate(types)}
+        covered = 0
 
         for i in range(split):
             t = team[i]
             team_types.append(t)
-            chart = self._update_chart(weaknesses, chart, t)
+            chart = self._update_chart(weaknesses, chart, indices[t])
+            covered |= self.resists[indices[t]]
 
         for i in range(split, self.size):
-            t = self._get_best_type(chart, types)
-            chart = self._update_chart(weaknesses, chart, t)
+            t = self._get_best_type(chart, types, covered)
+            chart = self._update_chart(weaknesses, chart, indices[t])
             uteam_exists = self._is_unique_team(team_types, t)
             while (t in team_types and self.utypes) or (
                 not uteam_exists and self.uteam
@@ -84,26 +124,27 @@ class NaiveGenerator(Generator):
                 ):
                     t = None
                     break
-                t = self._get_best_type(chart, types)
-                chart = self._update_chart(weaknesses, chart, t)
+                t = self._get_best_type(chart, types, covered)
+                chart = self._update_chart(weaknesses, chart, indices[t])
                 uteam_exists = self._is_unique_team(team_types, t)
             if t is not None:
                 team_types.append(t)
+                covered |= self.resists[indices[t]]
 
         return team_types
 
-    def _get_best_type(self, chart, types):
+    def _get_best_type(self, chart, types, covered=0):
         perf = np.sum(chart, axis=1)
+        if self.coverage > 0:
+            gained = type_coverage.count(self.resists & ~covered)
+            perf = perf - self.coverage * gained
         best = np.argmin(perf)
 
         return types[best]
 
     def _is_unique_team(self, team_types, t):
-        n_team_type = len(list(filter(lambda tt: tt == t, team_types))) + 1
-        fltr = np.logical_and(
-            self.pokemon["type_1"] == t[0], self.pokemon["type_2"] == t[1]
-        )
-        n_pokemon = self.pokemon.loc[fltr].shape[0]
+        n_team_type = team_types.count(t) + 1
+        n_pokemon = len(self.index.get(t, ()))
 
         return n_pokemon >= n_team_type
 
@@ -113,81 +154,67 @@ class NaiveGenerator(Generator):
 
         return n_pokemon <= n_team
 
-    def _update_chart(self, weaknesses, chart, t):
-        type_1 = t[0]
-        type_2 = t[1]
-
-        m, n = weaknesses.shape
-
-        update = chart * 0
-
-        type_weaknesses = weaknesses.loc[t, :]
-        min_weakness = np.amin(type_weaknesses)
-        weak_types = type_weaknesses[type_weaknesses == min_weakness]
-        fltr = np.logical_and(weak_types.index != type_1, weak_types.index != type_2)
-        update_types = weak_types.loc[fltr]
-        update.loc[t, :][update_types.index] += 1
-
-        type_weaknesses = weaknesses.loc[t, :]
-        max_weaknesses = np.amax(type_weaknesses)
-        strong_types = type_weaknesses[type_weaknesses == max_weaknesses].index
-        effective = weaknesses[strong_types]
-        update_indices = []
-        update_types = []
-        for row in range(m):
-            weakness_types = effective.columns[(effective.iloc[row, :] < 0).values]
-            e_type_1 = effective.index[row][0]
-            e_type_2 = effective.index[row][1]
-            not_in_strong_types = (e_type_1 not in strong_types) and (
-                e_type_2 not in strong_types
-            )
-            if len(weakness_types) > 0 and not_in_strong_types:
-                update_indices.append(row)
-                update_types.append(weakness_types)
-
-        for i in range(len(update_indices)):
-            index = update_indices[i]
-            weakness_types = update_types[i]
-            update.iloc[index, :][weakness_types] -= 1
-
-        chart = chart.add(update)
-
-        return chart
+    def _update_chart(self, weaknesses, chart, index):
+        """Updates the chart after the type pair at row 'index' joins the team.
+
+        Attacking types that the pair resists best, other than its own
+        types, are penalized for the pair itself. Type pairs that resist the
+        attacking types the pair is weakest to, and do not share those
+        types, are rewarded.
+        """
+
+        type_weaknesses = weaknesses[index]
+        update = np.zeros(chart.shape)
+
+        resisted = type_weaknesses == np.amin(type_weaknesses)
+        first, second = self.pair_types[index]
+        resisted &= (self.all_types != first) & (self.all_types != second)
+        update[index, resisted] += 1
+
+        strong = type_weaknesses == np.amax(type_weaknesses)
+        strong_types = self.all_types[strong]
+        unrelated = ~np.any(np.isin(self.pair_types, strong_types), axis=1)
+        effective = (weaknesses < 0) & strong & unrelated.reshape((-1, 1))
+        update[effective] -= 1
+
+        return chart + update
 
     def _get_team(self, team_types):
         team = []
 
         for no in self.team_no:
-            pkmn = self.pokemon[self.pokemon["no"] == no].squeeze()
-            if pkmn.empty:
+            rows = np.flatnonzero(self.pokemon_table.no == no)
+            if len(rows) <= 0:
                 continue
-            team.append(tools.frame_to_pokemon(pkmn))
+            team.append(self.pokemon_table[rows[0]])
 
         if len(self.team_no) > 0:
             team_types = team_types[len(team) :]
 
+        names = set(p.name for p in team)
+        starts = {}
         for t in team_types:
-            pkmn = self._get_pokemon(team, t)
+            pkmn = self._get_pokemon(t, names, starts)
             if pkmn is not None:
-                team.append(tools.frame_to_pokemon(pkmn))
+                team.append(pkmn)
+                names.add(pkmn.name)
 
         return team
 
-    def _get_pokemon(self, team, t):
-        type_1 = t[0]
-        type_2 = t[1]
-        fltr = np.logical_and(
-            self.pokemon["type_1"] == type_1, self.pokemon["type_2"] == type_2
-        )
-        pkmns = self.pokemon.loc[fltr]
+    def _get_pokemon(self, t, names, starts):
+        """Returns the best pokemon of type pair 't'.
+
+        With 'uteam' pokemon named in 'names' are skipped, and 'starts'
+        keeps the position of the next candidate for each type pair.
+        """
+
+        rows = self.index.get(t, ())
+        start = starts.get(t, 0)
         if self.uteam:
-            team_names = [p.name for p in team]
-            pkmns = pkmns[~pkmns.loc[:, "name"].isin(team_names)]
-        if pkmns.empty:
+            while start < len(rows) and self.pokemon_table.names[rows[start]] in names:
+                start += 1
+            starts[t] = start
+        if start >= len(rows):
             return None
-        stats = pkmns.iloc[:, tools.STAT_COLS]
-        weighted_stats = stats.multiply(self.weights.to_numpy())
-        index = weighted_stats.sum(axis=1).idxmax(axis=0)
-        pkmn = pkmns.loc[index]
 
-        return pkmn
+        return self.pokemon_table[rows[start]]
@@ -0,0 +1,175 @@
+from generators.genetic_generator import GeneticGenerator
+import numpy as np
+import tools
+import time
+
+
+class NSGAGenerator(GeneticGenerator):
+    def __init__(
+        self,
+        pokemon,
+        team_no=[],
+        size=6,
+        uteam=False,
+        weight=0.5,
+        gens=10,
+        teams=100,
+        mut=3,
+        time_limit=None,
+        seed=None,
+    ):
+        super().__init__(
+            pokemon,
+            team_no=team_no,
+            size=size,
+            uteam=uteam,
+            weight=weight,
+            gens=gens,
+            teams=teams,
+            mut=mut,
+            time_limit=time_limit,
+            seed=seed,
+        )
+        self.front = []
+
+    def generate(self):
+        """Runs NSGA-II on stat score and weakness score.
+
+        The Pareto front is stored in 'front' and the front team with the
+        best weighted score is returned.
+        """
+
+        self.team = []
+
+        teams = self._population()
+        objs = self._objectives(teams)
+        ranks, crowding = self._rank(objs)
+        start = time.perf_counter()
+
+        evolving = self.gens > 0
+        gen = 0
+        while evolving:
+            parents = self._tournament(ranks, crowding)
+            children = self._uniform_crossover(teams[parents[0]], teams[parents[1]])
+            children = self._mutate(children)
+
+            teams = np.concatenate((teams, children), axis=0)
+            objs = self._objectives(teams)
+            ranks, crowding = self._rank(objs)
+            keep = np.lexsort((-crowding, ranks))[: self.teams]
+            teams = teams[keep]
+            ranks = ranks[keep]
+            crowding = crowding[keep]
+
+            gen += 1
+            print(f"\rGeneration {gen}: {np.sum(ranks == 0)} teams on front", end="")
+            evolving = gen < self.gens and not self._stop(start, 0)
+        print("")
+
+        self.front = self._front(teams[ranks == 0])
+        weighted = [self.weight * f[1] + (1 - self.weight) * f[2] for f in self.front]
+        self.team = self._get_team(self.front[np.argmax(weighted)][0])
+
+        return self.team
+
+    def _objectives(self, teams):
+        """Evaluates stat and weakness scores for a team population."""
+
+        stat_total = self.team_stat + np.sum(self.stat_totals[teams], axis=1)
+        weak_total = self.team_weak + np.sum(self.weak_totals[teams], axis=1)
+        stat_score, weak_score = tools.objectives(stat_total, weak_total, self.n_team)
+
+        return np.stack((stat_score, weak_score), axis=1)
+
+    def _rank(self, objs):
+        """Sorts teams into non-dominated fronts of the two objectives.
+
+        Distinct score pairs are sorted by stat score and then weakness
+        score, both descending. A pair is on the current front when its
+        weakness score is above that of every remaining pair before it, so
+        each front is peeled with a running maximum.
+        """
+
+        points, inverse = np.unique(objs, axis=0, return_inverse=True)
+        order = np.lexsort((-points[:, 1], -points[:, 0]))
+        ranks = np.zeros((points.shape[0],), dtype=int)
+        rank = 0
+        while len(order) > 0:
+            weak = points[order, 1]
+            front = np.ones(weak.shape, dtype=bool)
+            front[1:] = weak[1:] > np.maximum.accumulate(weak)[:-1]
+            ranks[order[front]] = rank
+            order = order[~front]
+            rank += 1
+        ranks = ranks[inverse.ravel()]
+
+        return ranks, self._crowding(objs, ranks)
+
+    def _crowding(self, objs, ranks):
+        """Evaluates crowding distances within each front."""
+
+        n, m = objs.shape
+        crowding = np.zeros((n,))
+        span = np.ptp(objs, axis=0)
+        span[span <= 0] = 1
+        for k in range(m):
+            order = np.lexsort((objs[:, k], ranks))
+            values = objs[order, k]
+            front = ranks[order]
+            dist = np.full((n,), np.inf)
+            inner = (front[1:-1] == front[:-2]) & (front[1:-1] == front[2:])
+            gaps = (values[2:] - values[:-2]) / span[k]
+            dist[1:-1] = np.where(inner, gaps, np.inf)
+            crowding[order] += dist
+
+        return crowding
+
+    def _tournament(self, ranks, crowding):
+        """Selects parents by binary tournaments on rank and crowding."""
+
+        n = ranks.shape[0]
+        a = self.rng.integers(n, size=(2, n))
+        b = self.rng.integers(n, size=(2, n))
+        better = (ranks[a] < ranks[b]) | (
+            (ranks[a] == ranks[b]) & (crowding[a] > crowding[b])
+        )
+
+        return np.where(better, a, b)
+
+    def _uniform_crossover(self, first, second):
+        """Crosses teams by picking each member from either parent.
+
+        With 'uteam' repeated members are replaced by unique pokemon.
+        """
+
+        mask = self.rng.random(first.shape) < 0.5
+        teams = np.where(mask, first, second)
+        if not self.uteam or teams.shape[1] <= 1:
+            return teams
+
+        order = np.argsort(teams, axis=1)
+        ordered = np.take_along_axis(teams, order, axis=1)
+        repeated = np.zeros(teams.shape, dtype=bool)
+        np.put_along_axis(
+            repeated, order[:, 1:], ordered[:, 1:] == ordered[:, :-1], axis=1
+        )
+        # Rows are grouped by their number of repeats, so that each row only
+        # draws as many unique pokemon as it replaces.
+        counts = np.sum(repeated, axis=1)
+        for k in np.unique(counts[counts > 0]):
+            rows = np.flatnonzero(counts == k)
+            new_idx = self._get_unique(teams[rows], int(k))
+            replaced = teams[rows]
+            replaced[repeated[rows]] = new_idx.ravel()
+            teams[rows] = replaced
+
+        return teams
+
+    def _front(self, teams):
+        """Returns the unique front teams with their stat and weakness scores."""
+
+        teams = np.unique(np.sort(teams, axis=1), axis=0)
+        objs = self._objectives(teams)
+        order = np.argsort(-objs[:, 0])
+
+        return [(teams[i], objs[i, 0], objs[i, 1]) for i in order]
@@ -1,59 +1,177 @@
 from generators.generator import Generator
 from numpy.random import default_rng
+from sampling import AliasTable, MAX_REJECTIONS, draw_rows
+from pokemon_table import PokemonTable
+import pandas as pd
 import numpy as np
+import type_chart
 import tools
 
+CHUNK = 1 << 16
+
 
 class RandomGenerator(Generator):
     def __init__(
-        self, pokemon, team_no=[], size=6, utypes=False, uteam=False, seed=None
+        self,
+        pokemon,
+        team_no=[],
+        size=6,
+        utypes=False,
+        uteam=False,
+        weighted=False,
+        seed=None,
     ):
         self.pokemon = pokemon
         self.team_no = team_no
         self.size = size
         self.utypes = utypes
         self.uteam = uteam
+        self.weighted = weighted
         self.team = []
         self.rng = default_rng(seed)
+        self.pokemon_table = PokemonTable(self.pokemon)
+
+        n = self.pokemon.shape[0]
+        weights = np.ones((n,))
+        if self.weighted:
+            weights, _ = self.pokemon_table.get_totals()
+
+        pairs = type_chart.pair_codes(self.pokemon["type_1"], self.pokemon["type_2"])
+        self.types, _ = pd.factorize(pairs)
+        order = np.argsort(self.types, kind="stable")
+        counts = np.bincount(self.types, minlength=1)
+        self.buckets = np.split(order, np.cumsum(counts)[:-1])
+
+        self.table = AliasTable(weights)
+        self.type_table = AliasTable(np.bincount(self.types, weights=weights))
+        self.bucket_tables = [AliasTable(weights[b]) for b in self.buckets]
+
+        # The bucket tables concatenated, with aliases as pokemon rows, so
+        # that pokemon can be drawn from many buckets at once.
+        self.bucket_counts = counts
+        self.bucket_offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        self.bucket_prob = np.concatenate([t.prob for t in self.bucket_tables])
+        self.bucket_alias = np.concatenate(
+            [b[t.alias] for (b, t) in zip(self.buckets, self.bucket_tables)]
+        )
+        self.bucket_rows = order
 
     def generate(self):
         self.team = []
 
+        team_idx = self._get_team_idx()
+        k = self.size - len(team_idx)
+        if self.utypes:
+            team_idx += self._sample_unique_types(k, team_idx)
+        elif self.uteam:
+            team_idx += self._draw_unique(self.table, k, team_idx)
+        elif k > 0 and self.pokemon.shape[0] > 0:
+            team_idx += self.table.sample(self.rng, k).tolist()
+
+        return self._get_team(team_idx)
+
+    def sample(self, n, weight=0.5, chunk=CHUNK):
+        """Samples 'n' teams as an (n, size) matrix of pokemon rows.
+
+        Teams are drawn in chunks of 'chunk' rows without creating any
+        pokemon, and their scores for 'weight' are returned as well.
+        """
+
+        team_idx = np.array(self._get_team_idx(), dtype=np.int32)
+        k = self.size - len(team_idx)
+        stat_totals, weak_totals = self.pokemon_table.get_totals()
+        team_stat = np.sum(stat_totals[team_idx])
+        team_weak = np.sum(weak_totals[team_idx])
+
+        teams = np.zeros((n, self.size), dtype=np.int32)
+        teams[:, : len(team_idx)] = team_idx
+        scores = np.zeros((n,))
+        for start in range(0, n, chunk):
+            m = min(chunk, n - start)
+            if self.utypes:
+                members = self._sample_type_rows(m, k, team_idx)
+            elif self.uteam:
+                forbidden = np.zeros((len(self.table),), dtype=bool)
+                forbidden[team_idx] = True
+                members = draw_rows(self.rng, self.table, m, k, forbidden)
+            else:
+                members = self.table.sample(self.rng, (m, k))
+
+            stat_total = team_stat + np.sum(stat_totals[members], axis=1)
+            weak_total = team_weak + np.sum(weak_totals[members], axis=1)
+            teams[start : start + m, len(team_idx) :] = members
+            scores[start : start + m] = tools.score(
+                stat_total, weak_total, self.size, weight=weight
+            )
+
+        return teams, scores
+
+    def _get_team_idx(self):
+        """Returns the rows of the fixed team members."""
+
+        nos = self.pokemon["no"].to_numpy()
+        team_idx = []
         for no in self.team_no:
-            pkmn = self.pokemon[self.pokemon["no"] == no].squeeze()
-            if pkmn.empty:
+            rows = np.flatnonzero(nos == no)
+            if len(rows) <= 0:
                 continue
-            self.team.append(tools.frame_to_pokemon(pkmn))
-
-        if self.utypes:
-            self._filter_unique_types()
+            team_idx.append(int(rows[0]))
 
-        return self._get_team()
+        return team_idx
 
-    def _get_team(self):
-        n = self.pokemon.shape[0]
-        replace = not self.uteam
-        rdx = self.rng.choice(n, self.size - len(self.team), replace=replace)
-        pkmns = self.pokemon.iloc[rdx, :]
-        rows = pkmns.shape[0]
-        for row in range(rows):
-            self.team.append(tools.frame_to_pokemon(pkmns.iloc[row, :]))
+    def _get_team(self, team_idx):
+        self.team += self.pokemon_table.team(team_idx)
 
         return self.team
 
-    def _get_unique_types(self):
-        all_types = self.pokemon[["type_1", "type_2"]]
-        unique_types = all_types.drop_duplicates().reset_index()
+    def _sample_unique_types(self, k, team_idx):
+        """Draws one pokemon from each of 'k' type pairs not on the team."""
 
-        return unique_types
+        used = [self.types[i] for i in team_idx]
+        types = self._draw_unique(self.type_table, k, used)
 
-    def _filter_unique_types(self):
-        unique_types = self._get_unique_types()
-        n = unique_types.shape[0]
-        rdx = self.rng.choice(n, self.size - len(self.team), replace=False)
-        team_types = unique_types.iloc[rdx, :]
-        fltr = np.logical_and(
-            self.pokemon["type_1"].isin(unique_types["type_1"]),
-            self.pokemon["type_2"].isin(unique_types["type_2"]),
-        )
-        self.pokemon = self.pokemon.loc[fltr]
+        return [
+            int(self.buckets[t][self.bucket_tables[t].sample(self.rng)]) for t in types
+        ]
+
+    def _draw_unique(self, table, k, used):
+        """Draws 'k' indices from 'table' that are not in 'used'.
+
+        Repeated draws are rejected, which takes O(k) draws unless most of
+        the weight is already used. Then the rest is drawn without
+        replacement from the unused indices.
+        """
+
+        drawn = set(int(i) for i in used)
+        n_used = np.count_nonzero(table.weights[list(drawn)] > 0)
+        k = min(k, table.support - n_used)
+
+        team = []
+        for _ in range(MAX_REJECTIONS * k):
+            if len(team) >= k:
+                break
+            i = int(table.sample(self.rng))
+            if i not in drawn:
+                drawn.add(i)
+                team.append(i)
+
+        if len(team) < k:
+            rest = np.flatnonzero(table.weights > 0)
+            rest = rest[~np.isin(rest, list(drawn))]
+            p = table.weights[rest] / np.sum(table.weights[rest])
+            team += self.rng.choice(rest, k - len(team), replace=False, p=p).tolist()
+
+        return team
+
+    def _sample_type_rows(self, m, k, team_idx):
+        """Draws 'm' teams of pokemon from 'k' distinct type pairs each."""
+
+        forbidden = np.zeros((len(self.type_table),), dtype=bool)
+        forbidden[self.types[team_idx]] = True
+        types = draw_rows(self.rng, self.type_table, m, k, forbidden)
+
+        counts = self.bucket_counts[types]
+        idx = self.bucket_offsets[types] + self.rng.integers(counts)
+        keep = self.rng.random(types.shape) < self.bucket_prob[idx]
+
+        return np.where(keep, self.bucket_rows[idx], self.bucket_alias[idx])
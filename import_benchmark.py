@@ -0,0 +1,122 @@
+from getopt import getopt, GetoptError
+import subprocess
+import time
+import sys
+
+
+def import_times(module):
+    """Runs 'python -X importtime' and returns cumulative times in ms.
+
+    Only 'module' and the imports below it are returned, so imports made
+    by the interpreter at startup are left out.
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    subtree = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        subtree[name.strip()] = (int(cumulative) / 1000, depth)
+        # Imports are listed after their own imports, so a top level import
+        # closes its subtree.
+        if depth == 0:
+            if name.strip() == module:
+                times = subtree
+            subtree = {}
+
+    return times
+
+
+def first_output_time(args):
+    """Returns the time in ms until 'team.py' writes its first line."""
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "team.py"] + args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    process.stdout.readline()
+    elapsed = (time.perf_counter() - start) * 1000
+    process.kill()
+    process.wait()
+
+    return elapsed
+
+
+def median(values):
+    values = sorted(values)
+
+    return values[len(values) // 2]
+
+
+def main(argv):
+    short_options = "h"
+    long_options = ["help", "module=", "runs=", "top=", "args=", "limit="]
+    help_message = """usage: import_benchmark.py [options]
+    options:
+        -h, --help          Prints help message.
+        --module m          Sets imported module to 'm'. Default: 'team'.
+        --runs r            Sets number of runs to 'r'. Default: '5'.
+        --top t             Prints the 't' slowest imports. Default: '10'.
+        --args a            Sets team.py arguments to 'a'. Default: '--dex galar --output jsonl'.
+        --limit l           Fails if the import takes over 'l' ms. Default: 'None'."""
+
+    try:
+        opts, args = getopt(argv, shortopts=short_options, longopts=long_options)
+    except GetoptError:
+        print(help_message)
+        return 0
+
+    module = "team"
+    runs = 5
+    top = 10
+    team_args = ["--dex", "galar", "--output", "jsonl"]
+    limit = None
+
+    for opt, arg in opts:
+        if opt in ["-h", "--help"]:
+            print(help_message)
+            return 0
+        elif opt == "--module":
+            module = arg
+        elif opt == "--runs":
+            runs = int(arg)
+        elif opt == "--top":
+            top = int(arg)
+        elif opt == "--args":
+            team_args = arg.split()
+        elif opt == "--limit":
+            limit = float(arg)
+
+    samples = [import_times(module) for _ in range(runs)]
+    totals = [times[module][0] for times in samples]
+    total = median(totals)
+    first_output = median([first_output_time(team_args) for _ in range(runs)])
+
+    print(f"Import {module}: {total:.1f} ms (median of {runs})")
+    print(f"First output: {first_output:.1f} ms (median of {runs})")
+    print("Slowest direct imports:")
+    times = samples[totals.index(total)]
+    direct = [(t, name) for (name, (t, depth)) in times.items() if depth == 1]
+    for (t, name) in sorted(direct, reverse=True)[:top]:
+        print(f"{t:10.1f} ms | {name}")
+
+    if limit is not None and total > limit:
+        print(f"Import {module} exceeds the limit of {limit:.1f} ms")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
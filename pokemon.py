@@ -1,6 +1,20 @@
 from enum import Enum
 
 
+class Game(Enum):
+    SWSH = "swsh"
+    BDSP = "bdsp"
+
+
+class Dex(Enum):
+    GALAR = "galar"
+    ARMOR = "armor"
+    CROWN = "crown"
+    OTHER = "other"
+    SINNOH = "sinnoh"
+    ALL = "all"
+
+
 class Pokemon:
     def __init__(
         self,
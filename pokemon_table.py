@@ -0,0 +1,127 @@
+from pokemon import Type
+import numpy as np
+import type_chart
+import tools
+
+TYPES = [Type(t) for t in type_chart.TYPES]
+NO_TYPE = len(TYPES)
+
+
+class PokemonTable:
+    def __init__(self, pokemon):
+        """Stores the columns of a pokemon frame as compact arrays."""
+
+        self.no = pokemon["no"].to_numpy(dtype=np.int16)
+        self.names = pokemon["name"].to_numpy(dtype=object)
+        codes = [type_chart.to_codes(pokemon[c]) for c in ["type_1", "type_2"]]
+        codes = np.stack(codes, axis=1)
+        self.types = np.where(codes < 0, NO_TYPE, codes).astype(np.uint8)
+        self.stage = pokemon["stage"].to_numpy(dtype=np.int8)
+        self.flags = pokemon[
+            ["is_final", "is_legendary", "is_mythical", "is_ultra"]
+        ].to_numpy(dtype=bool)
+        self.stats = pokemon.iloc[:, tools.STAT_COLS].to_numpy(dtype=np.int16)
+        self.weaknesses = pokemon.iloc[:, tools.WEAK_COLS].to_numpy(dtype=np.float16)
+
+    def __len__(self):
+        return len(self.no)
+
+    def __getitem__(self, row):
+        return PokemonView(self, int(row))
+
+    def team(self, rows):
+        """Returns views of the pokemon in 'rows'."""
+
+        return [PokemonView(self, int(row)) for row in rows]
+
+    def get_totals(self):
+        """Returns stat and weakness totals for each pokemon."""
+
+        stat_totals = np.sum(self.stats, axis=1, dtype=float)
+        weak_totals = np.sum(self.weaknesses, axis=1, dtype=float)
+
+        return stat_totals, weak_totals
+
+
+class PokemonView:
+    """A pokemon as a row of a 'PokemonTable'."""
+
+    __slots__ = ("table", "row")
+
+    def __init__(self, table, row):
+        self.table = table
+        self.row = row
+
+    @property
+    def no(self):
+        return int(self.table.no[self.row])
+
+    @property
+    def name(self):
+        return self.table.names[self.row]
+
+    @property
+    def type_1(self):
+        return self._type(0)
+
+    @property
+    def type_2(self):
+        return self._type(1)
+
+    @property
+    def stage(self):
+        return int(self.table.stage[self.row])
+
+    @property
+    def is_final(self):
+        return bool(self.table.flags[self.row, 0])
+
+    @property
+    def is_legendary(self):
+        return bool(self.table.flags[self.row, 1])
+
+    @property
+    def is_mythical(self):
+        return bool(self.table.flags[self.row, 2])
+
+    @property
+    def is_ultra(self):
+        return bool(self.table.flags[self.row, 3])
+
+    @property
+    def hp(self):
+        return int(self.table.stats[self.row, 0])
+
+    @property
+    def attack(self):
+        return int(self.table.stats[self.row, 1])
+
+    @property
+    def defense(self):
+        return int(self.table.stats[self.row, 2])
+
+    @property
+    def sp_attack(self):
+        return int(self.table.stats[self.row, 3])
+
+    @property
+    def sp_defense(self):
+        return int(self.table.stats[self.row, 4])
+
+    @property
+    def speed(self):
+        return int(self.table.stats[self.row, 5])
+
+    @property
+    def weaknesses(self):
+        values = self.table.weaknesses[self.row].tolist()
+
+        return {t.value: value for (t, value) in zip(TYPES, values)}
+
+    def get_total_stat(self):
+        return int(np.sum(self.table.stats[self.row], dtype=int))
+
+    def _type(self, i):
+        code = self.table.types[self.row, i]
+
+        return None if code >= NO_TYPE else TYPES[code]
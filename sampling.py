@@ -0,0 +1,101 @@
+import numpy as np
+
+MAX_REJECTIONS = 32
+
+
+class AliasTable:
+    def __init__(self, weights):
+        """Builds Walker alias tables by Vose's method in O(n)."""
+
+        weights = np.asarray(weights, dtype=float)
+        n = len(weights)
+        total = np.sum(weights)
+        if total <= 0:
+            weights = np.ones((n,))
+            total = n
+
+        prob = weights * n / total
+        alias = np.arange(n)
+        small = np.flatnonzero(prob < 1).tolist()
+        large = np.flatnonzero(prob >= 1).tolist()
+        while len(small) > 0 and len(large) > 0:
+            s = small.pop()
+            l = large.pop()
+            alias[s] = l
+            prob[l] -= 1 - prob[s]
+            if prob[l] < 1:
+                small.append(l)
+            else:
+                large.append(l)
+        # Leftovers are off from one by rounding only.
+        prob[small + large] = 1
+
+        self.weights = weights
+        self.support = np.count_nonzero(weights > 0)
+        self.prob = prob
+        self.alias = alias
+
+    def __len__(self):
+        return len(self.prob)
+
+    def sample(self, rng, size=None):
+        """Draws indices in O(1) each."""
+
+        idx = rng.integers(len(self.prob), size=size)
+        keep = rng.random(size) < self.prob[idx]
+
+        return np.where(keep, idx, self.alias[idx])
+
+
+def draw_rows(rng, table, m, k, forbidden, members=None):
+    """Draws 'm' rows of 'k' distinct indices from 'table'.
+
+    Indices in 'forbidden', and in row 'i' of 'members' for row 'i', are
+    never drawn. Rows with repeated or excluded indices are redrawn. Rows
+    that keep failing are drawn without replacement by the 'k' smallest
+    keys of exponential noise divided by the weights.
+    """
+
+    weights = table.weights
+    allowed = (weights > 0) & ~forbidden
+    available = np.full((m,), np.count_nonzero(allowed))
+    if members is not None and members.shape[1] > 0:
+        ordered = np.sort(members, axis=1)
+        distinct = np.ones(ordered.shape, dtype=bool)
+        distinct[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+        available -= np.sum(distinct & allowed[ordered], axis=1)
+    if m > 0 and k > np.amin(available):
+        raise ValueError("Not enough pokemon for unique teams.")
+
+    rows = table.sample(rng, (m, k))
+    bad = _is_invalid(rows, forbidden, members)
+    for _ in range(MAX_REJECTIONS):
+        if not np.any(bad):
+            break
+        rows[bad] = table.sample(rng, (np.count_nonzero(bad), k))
+        bad_members = None if members is None else members[bad]
+        bad[bad] = _is_invalid(rows[bad], forbidden, bad_members)
+
+    if np.any(bad):
+        keys = rng.exponential(size=(np.count_nonzero(bad), len(table)))
+        with np.errstate(divide="ignore"):
+            keys /= weights
+        keys[:, ~allowed] = np.inf
+        if members is not None:
+            np.put_along_axis(keys, members[bad], np.inf, axis=1)
+        rows[bad] = np.argpartition(keys, k - 1, axis=1)[:, :k]
+
+    return rows
+
+
+def _is_invalid(rows, forbidden, members=None):
+    """Checks rows for repeated, forbidden or member indices."""
+
+    ordered = np.sort(rows, axis=1)
+    invalid = np.any(ordered[:, 1:] == ordered[:, :-1], axis=1)
+    invalid |= np.any(forbidden[rows], axis=1)
+    if members is not None:
+        hits = rows[:, :, np.newaxis] == members[:, np.newaxis, :]
+        invalid |= np.any(hits, axis=(1, 2))
+
+    return invalid
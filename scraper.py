@@ -1,4 +1,4 @@
-from pokemon import Pokemon, Stats, Type
+from pokemon import Pokemon, Stats, Type, Game, Dex
 from multiprocessing import Manager, Process, Pool, cpu_count
 from urllib import request as req
 from functools import partial
@@ -9,20 +9,6 @@ import time
 import re
 
 
-class Game(Enum):
-    SWSH = "swsh"
-    BDSP = "bdsp"
-
-
-class Dex(Enum):
-    GALAR = "galar"
-    ARMOR = "armor"
-    CROWN = "crown"
-    OTHER = "other"
-    SINNOH = "sinnoh"
-    ALL = "all"
-
-
 DEX_URLS = {
     "swsh": {
         "galar": "/swordshield/galarpokedex.shtml",
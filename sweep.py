@@ -0,0 +1,146 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from numpy.random import SeedSequence
+from getopt import getopt, GetoptError
+from os import cpu_count
+import numpy as np
+import team
+import tools
+import json
+import sys
+import os
+
+SWEEP = None
+
+
+def _init(pokemon, gen_type, params, chart):
+    """Builds the sweep generator once per worker.
+
+    Each seed reseeds the generator, so it is built and pickled once per
+    worker instead of once per seed.
+    """
+
+    global SWEEP
+    generator = team.get_generator(pokemon, gen_type, params, chart=chart)
+    totals = generator.pokemon_table.get_totals()
+    SWEEP = (generator, totals, params)
+
+
+def _run_seed(task):
+    """Generates the team of one spawned seed."""
+
+    index, seed = task
+    generator, (stat_totals, weak_totals), params = SWEEP
+    generator.reseed(seed)
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        pkmns = generator.generate()
+
+    rows = [p.row for p in pkmns]
+    score = tools.score(
+        np.sum(stat_totals[rows]),
+        np.sum(weak_totals[rows]),
+        len(rows),
+        weight=params["weight"],
+    )
+
+    return {
+        "index": index,
+        "no": [p.no for p in pkmns],
+        "name": [p.name for p in pkmns],
+        "score": float(score),
+    }
+
+
+def sweep(
+    pokemon,
+    gen_type,
+    params,
+    seeds=100,
+    seed=None,
+    workers=None,
+    file=None,
+    chart=None,
+):
+    """Generates one team per seed spawned from 'seed' on a process pool.
+
+    Seed 'i' is always the i:th child of 'seed' and records are written in
+    seed order, so the output does not depend on the number of workers.
+    """
+
+    root = SeedSequence(seed)
+    tasks = list(enumerate(root.spawn(seeds)))
+    workers = cpu_count() if workers is None else workers
+    chunksize = max(1, len(tasks) // (4 * workers))
+
+    out = sys.stdout if file is None else open(file, "w")
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init,
+            initargs=(pokemon, gen_type, params, chart),
+        ) as executor:
+            for record in executor.map(_run_seed, tasks, chunksize=chunksize):
+                record["seed"] = root.entropy
+                record["gen"] = gen_type.value
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+    finally:
+        if file is not None:
+            out.close()
+
+
+def main(argv):
+    short_options = "h"
+    long_options = ["help", "seed=", "seeds=", "workers=", "file="]
+    help_message = """usage: sweep.py [options] -- [team options]
+    options:
+        -h, --help          Prints help message.
+        --seed s            Sets root seed to 's'. Default: 'None'.
+        --seeds n           Sets number of spawned seeds to 'n'. Default: '100'.
+        --workers w         Sets number of workers to 'w'. Default: 'None' (cpu_count).
+        --file f            Sets JSONL output file to 'f'. Default: 'None' (stdout).
+    team options:
+        See 'team.py --help'."""
+
+    try:
+        opts, args = getopt(argv, shortopts=short_options, longopts=long_options)
+    except GetoptError:
+        print(help_message)
+        return
+
+    seed = None
+    seeds = 100
+    workers = None
+    file = None
+
+    for opt, arg in opts:
+        if opt in ["-h", "--help"]:
+            print(help_message)
+            return
+        elif opt == "--seed":
+            seed = int(arg)
+        elif opt == "--seeds":
+            seeds = int(arg)
+        elif opt == "--workers":
+            workers = int(arg)
+        elif opt == "--file":
+            file = arg
+
+    options = team.parse_args(args)
+    if options is None:
+        return
+
+    sweep(
+        options["pokemon"],
+        options["gen_type"],
+        options["params"],
+        seeds=seeds,
+        seed=seed,
+        workers=workers,
+        file=file,
+        chart=options["chart"],
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,44 +1,135 @@
-from generators.genetic_generator import GeneticGenerator
-from generators.random_generator import RandomGenerator
-from generators.naive_generator import NaiveGenerator
 from generators.generator import GeneratorType
-from pokemon import Type, Stats
-from scraper import Game, Dex
+from pokemon import Type, Stats, Game, Dex
+from numpy.random import SeedSequence
+from contextlib import redirect_stdout
+from collections import OrderedDict
 from getopt import getopt, GetoptError
 import pandas as pd
 import numpy as np
-import asciify
+import type_coverage
+import type_chart
+import cache
 import tools
+import json
 import sys
 import os
 
 
-def load(game=Game.SWSH, dex=Dex.ALL):
-    if dex == Dex.ALL:
-        galar_dex = load_dex(dex=Dex.GALAR)
-        armor_dex = load_dex(dex=Dex.ARMOR)
-        crown_dex = load_dex(dex=Dex.CROWN)
-        other_dex = load_dex(dex=Dex.OTHER)
-        dex = pd.concat([galar_dex, armor_dex, crown_dex, other_dex])
-        dex = dex[~dex.index.duplicated(keep="first")]
-        return dex.drop_duplicates()
-    else:
-        return load_dex(game=game, dex=dex)
+GAME_DEXES = {
+    Game.SWSH: [Dex.GALAR, Dex.ARMOR, Dex.CROWN, Dex.OTHER],
+    Game.BDSP: [Dex.SINNOH, Dex.OTHER],
+}
+DEX_BITS = {dex: 1 << i for (i, dex) in enumerate(Dex) if dex != Dex.ALL}
+MAX_FILTERS = 32
+FILTERS = OrderedDict()
+
+
+def load(game=Game.SWSH, dex=Dex.ALL, derive=False):
+    """Loads a dex from the unified table of a game.
+
+    The table is read from the binary dex cache, which is keyed by the
+    sizes and mtimes of the dex files and rebuilt whenever one of them
+    changes. A dex is selected by its bit in the 'dexes' column.
+    """
+
+    name = f"dex-{game.value}"
+    if derive:
+        name = f"{name}-derived"
+    key = cache.file_stamp(*get_dex_files(game))
+
+    pokemon = cache.load_frame(name, key, lambda: read_dex(game=game, derive=derive))
+    if dex != Dex.ALL:
+        in_dex = (pokemon["dexes"].to_numpy() & DEX_BITS[dex]) > 0
+        pokemon = pokemon[in_dex].reset_index(drop=True)
+
+    return set_type_dtype(pokemon)
+
+
+def set_type_dtype(pokemon):
+    """Stores the type columns as categorical type codes."""
+
+    pokemon["type_1"] = pokemon["type_1"].astype(type_chart.TYPE_DTYPE)
+    pokemon["type_2"] = pokemon["type_2"].astype(type_chart.TYPE_DTYPE)
+
+    return pokemon
+
+
+def read_dex(game=Game.SWSH, derive=False):
+    """Reads the dex files of a game into one table keyed by NO and name.
+
+    The 'dexes' column is a bitmask of the dexes that contain a pokemon.
+    Pokemon in several dexes keep the row of the first dex they are in.
+    Raises FileNotFoundError if any dex file of the game is missing.
+    """
+
+    get_dex_files(game)
+    dexes = []
+    for dex in GAME_DEXES[game]:
+        pokemon = load_dex(game=game, dex=dex, derive=derive)
+        pokemon["dexes"] = DEX_BITS[dex]
+        dexes.append(pokemon)
+    pokemon = pd.concat(dexes, ignore_index=True)
+
+    keys = ["no", "name"]
+    bits = pokemon.groupby(keys, sort=False)["dexes"].transform(np.bitwise_or.reduce)
+    pokemon["dexes"] = bits
+    pokemon = pokemon.drop_duplicates(subset=keys, keep="first")
+
+    return pokemon.reset_index(drop=True)
 
 
-def load_dex(game, dex):
-    file_name = f"pokemon/{game.value}/{dex.value}.csv"
-    pokemon = pd.read_csv(file_name, sep=",")
+def get_dex_file(game, dex):
+    return f"pokemon/{game.value}/{dex.value}.csv"
+
+
+def get_dex_files(game):
+    """Returns the dex files of a game, raising if any of them is missing."""
+
+    file_names = [get_dex_file(game, dex) for dex in GAME_DEXES[game]]
+    for file_name in file_names:
+        if not os.path.exists(file_name):
+            raise FileNotFoundError(f"Missing dex file {file_name}.")
+
+    return file_names
+
+
+def load_type_chart(game=Game.SWSH, dex=Dex.ALL, derive=False):
+    """Loads the type pair weakness chart of a dex from the cache.
+
+    The cache is keyed by the hash of the dex files, so the chart is only
+    rebuilt when the files change.
+    """
+
+    name = f"{game.value}-{dex.value}"
+    if derive:
+        name = f"{name}-derived"
+    key = cache.file_hash(*get_dex_files(game))
+
+    return cache.load_arrays(
+        [f"type_pairs-{name}", f"type_chart-{name}"],
+        key,
+        lambda: tools.get_type_chart(load(game=game, dex=dex, derive=derive)),
+    )
+
+
+def load_dex(game, dex, derive=False):
+    """Loads a dex, computing weaknesses from the types if 'derive' is set.
+
+    Weaknesses are always computed for files without weakness columns.
+    """
+
+    pokemon = pd.read_csv(get_dex_file(game, dex), sep=",")
     pokemon.fillna("", inplace=True)
 
-    rows = pokemon.shape[0]
-    for row in range(rows):
-        type_1 = pokemon.loc[row, "type_1"]
-        type_2 = pokemon.loc[row, "type_2"]
+    type_1 = pokemon["type_1"].to_numpy(dtype=str)
+    type_2 = pokemon["type_2"].to_numpy(dtype=str)
+    swap = (type_2 != "") & (type_2 < type_1)
+    pokemon["type_1"] = np.where(swap, type_2, type_1)
+    pokemon["type_2"] = np.where(swap, type_1, type_2)
+    pokemon = set_type_dtype(pokemon)
 
-        if len(type_2) > 0 and type_2 < type_1:
-            pokemon.loc[row, "type_1"] = type_2
-            pokemon.loc[row, "type_2"] = type_1
+    if derive or not set(type_chart.TYPES).issubset(pokemon.columns):
+        pokemon = type_chart.derive(pokemon)
 
     return pokemon
 
@@ -54,39 +145,101 @@ def filter_pokemon(
     allow_mythical=True,
     allow_ultra=True,
 ):
-    pokemon = pokemon[~pokemon["no"].isin(skip_no)]
-    pokemon = pokemon[pokemon["hp"] >= stats[Stats.HP]]
-    pokemon = pokemon[pokemon["attack"] >= stats[Stats.ATTACK]]
-    pokemon = pokemon[pokemon["defense"] >= stats[Stats.DEFENSE]]
-    pokemon = pokemon[pokemon["sp_attack"] >= stats[Stats.SP_ATTACK]]
-    pokemon = pokemon[pokemon["sp_defense"] >= stats[Stats.SP_DEFENSE]]
-    pokemon = pokemon[pokemon["speed"] >= stats[Stats.SPEED]]
-    pokemon = pokemon[
-        pokemon["hp"]
-        + pokemon["attack"]
-        + pokemon["defense"]
-        + pokemon["sp_attack"]
-        + pokemon["sp_defense"]
-        + pokemon["speed"]
-        >= stats[Stats.TOTAL]
-    ]
+    idx = filter_index(
+        pokemon,
+        stats,
+        types=types,
+        stage=stage,
+        skip_no=skip_no,
+        only_final=only_final,
+        allow_legendary=allow_legendary,
+        allow_mythical=allow_mythical,
+        allow_ultra=allow_ultra,
+    )
+
+    return pokemon.iloc[idx]
+
+
+def filter_index(
+    pokemon,
+    stats,
+    types=None,
+    stage=None,
+    skip_no=[],
+    only_final=False,
+    allow_legendary=True,
+    allow_mythical=True,
+    allow_ultra=True,
+):
+    """Returns the rows of 'pokemon' that pass all filters.
+
+    The filters are combined into one mask over the columns. Results are
+    cached by filters and by a hash of the columns they read, so repeated
+    filters of unchanged columns are not recomputed.
+    """
+
+    spec = (
+        tuple(sorted((stat.value, value) for (stat, value) in stats.items())),
+        None if types is None else tuple(t.value for t in types),
+        stage,
+        tuple(skip_no),
+        only_final,
+        allow_legendary,
+        allow_mythical,
+        allow_ultra,
+    )
+
+    columns = [s.value for s in Stats if s != Stats.TOTAL]
+    values = pokemon[columns].to_numpy()
+    nos = pokemon["no"].to_numpy()
+    arrays = [values, nos]
+    if types is not None:
+        codes_1 = type_chart.to_codes(pokemon["type_1"])
+        codes_2 = type_chart.to_codes(pokemon["type_2"])
+        arrays += [codes_1, codes_2]
+    flags = {
+        "stage": stage is not None,
+        "is_final": only_final,
+        "is_legendary": not allow_legendary,
+        "is_mythical": not allow_mythical,
+        "is_ultra": not allow_ultra,
+    }
+    flags = {name: pokemon[name].to_numpy() for (name, used) in flags.items() if used}
+    arrays += flags.values()
+
+    key = (spec, cache.array_hash(*arrays))
+    if key in FILTERS:
+        FILTERS.move_to_end(key)
+        return FILTERS[key]
+
+    minimums = np.array([stats[s] for s in Stats if s != Stats.TOTAL])
+    mask = np.all(values >= minimums, axis=1)
+    mask &= np.sum(values, axis=1) >= stats[Stats.TOTAL]
+    mask &= ~np.isin(nos, skip_no)
 
     if types is not None:
         for t in types:
-            fltr = np.logical_or(pokemon.type_1 == t.value, pokemon.type_2 == t.value)
-            pokemon = pokemon[fltr]
+            code = type_chart.TYPE_IDX[t.value]
+            mask &= (codes_1 == code) | (codes_2 == code)
     if stage is not None:
-        pokemon = pokemon[pokemon["stage"] == stage]
+        mask &= flags["stage"] == stage
     if only_final:
-        pokemon = pokemon[pokemon["is_final"] == 1]
+        mask &= flags["is_final"] == 1
     if not allow_legendary:
-        pokemon = pokemon[pokemon["is_legendary"] == 0]
+        mask &= flags["is_legendary"] == 0
     if not allow_mythical:
-        pokemon = pokemon[pokemon["is_mythical"] == 0]
+        mask &= flags["is_mythical"] == 0
     if not allow_ultra:
-        pokemon = pokemon[pokemon["is_ultra"] == 0]
+        mask &= flags["is_ultra"] == 0
 
-    return pokemon
+    idx = np.flatnonzero(mask)
+    idx.flags.writeable = False
+
+    FILTERS[key] = idx
+    while len(FILTERS) > MAX_FILTERS:
+        FILTERS.popitem(last=False)
+
+    return idx
 
 
 def print_team(game, team, color=False):
@@ -159,6 +312,8 @@ def get_combined_team_images(output, team_images):
 
 
 def get_team_images(game, team, color=False):
+    import asciify
+
     team_images = []
     for pokemon in team:
         no = str(pokemon.no)
@@ -177,11 +332,10 @@ def get_team_images(game, team, color=False):
     return team_images, width
 
 
-def print_team_statistics(pokemon, team, weight):
+def print_team_statistics(pokemon, team, weight, optimum=None):
     print("--------------")
     print("| Statistics |")
     print("--------------")
-    nos = np.zeros((len(team),))
     total = np.zeros((len(team),))
     hp = np.zeros((len(team),))
     attack = np.zeros((len(team),))
@@ -190,7 +344,6 @@ def print_team_statistics(pokemon, team, weight):
     sp_defense = np.zeros((len(team),))
     speed = np.zeros((len(team),))
     for i, p in enumerate(team):
-        nos[i] = p.no
         total[i] = p.get_total_stat()
         hp[i] = p.hp
         attack[i] = p.attack
@@ -205,10 +358,241 @@ def print_team_statistics(pokemon, team, weight):
     print(f"Mean Sp. Attack: {sp_attack.mean():.2f}")
     print(f"Mean Sp. Defense: {sp_defense.mean():.2f}")
     print(f"Mean Speed: {speed.mean():.2f}")
-    print(f"Team Score: {tools.fitness(pokemon, nos, weight=weight):.2f}")
+    coverage = type_coverage.TypeCoverage(pokemon)
+    team_idx = np.array([p.row for p in team], dtype=int)
+    resisted = coverage.resisted(team_idx.reshape((1, -1)))[0]
+    n_resisted = type_coverage.count(resisted)
+    print(f"Resisted Types: {n_resisted}/{type_coverage.N_TYPES}")
+    unresisted = coverage.names(~resisted)
+    if len(unresisted) > 0:
+        print(f"Unresisted Types: {', '.join(unresisted)}")
+    score = tools.fitness(pokemon, team_idx, weight=weight)
+    print(f"Team Score: {score:.2f}")
+    if optimum is not None:
+        print(f"Optimal Score: {optimum:.2f}")
+        print(f"Optimality Gap: {optimum - score:.4f}")
+
+
+def print_front(front):
+    print("----------------")
+    print("| Pareto Front |")
+    print("----------------")
+    print("Stat Score | Weakness Score | Team")
+    for team in front:
+        names = ", ".join(team["name"])
+        print(f"{team['stat_score']:10.2f} | {team['weak_score']:14.2f} | {names}")
+
+
+def get_seeds(seed, count=1):
+    """Returns the root seed sequence of 'seed' and the seed of each team.
+
+    A single team is seeded by the root itself, which gives the same team
+    as seeding with 'seed'. More teams are seeded by the root's children.
+    """
+
+    root = SeedSequence(seed)
+    seeds = [root] if count <= 1 else root.spawn(count)
+
+    return root, seeds
+
+
+def write_teams(
+    pokemon, gen_type, params, count=1, seed=None, file=None, chart=None
+):
+    """Generates teams and streams them as JSON lines.
 
+    The generator is built once and reseeded for each team with the seeds
+    from 'get_seeds', so team 'i' can be reproduced from the recorded seed
+    and the count. Generator output is redirected to stderr.
+    """
+
+    root, seeds = get_seeds(seed, count)
+    record_params = dict(params)
+    record_params["weights"] = np.asarray(params["weights"]).ravel().tolist()
+    generator = get_generator(pokemon, gen_type, params, chart=chart)
+    stat_totals, weak_totals = generator.pokemon_table.get_totals()
+
+    out = sys.stdout if file is None else open(file, "w")
+    try:
+        for (i, team_seed) in enumerate(seeds):
+            generator.reseed(team_seed)
+            with redirect_stdout(sys.stderr):
+                team = generator.generate()
+
+            rows = [p.row for p in team]
+            score = tools.score(
+                np.sum(stat_totals[rows]),
+                np.sum(weak_totals[rows]),
+                len(rows),
+                weight=params["weight"],
+            )
+            record = {
+                "team": i,
+                "seed": root.entropy,
+                "no": [p.no for p in team],
+                "name": [p.name for p in team],
+                "score": float(score),
+                "gen": gen_type.value,
+                "params": record_params,
+            }
+            if gen_type == GeneratorType.NSGA:
+                record["front"] = get_front(generator)
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+    finally:
+        if file is not None:
+            out.close()
+
+
+def get_front(generator):
+    """Returns the Pareto front of a generator with team numbers and names."""
+
+    front = []
+    for (team, stat_score, weak_score) in generator.front:
+        pkmns = generator._get_team(team)
+        front.append(
+            {
+                "no": [int(p.no) for p in pkmns],
+                "name": [p.name for p in pkmns],
+                "stat_score": float(stat_score),
+                "weak_score": float(weak_score),
+            }
+        )
+
+    return front
+
+
+def get_generator(pokemon, gen_type, params, seed=None, chart=None):
+    """Creates a team generator from the command line parameters.
+
+    Generator modules are imported on use, so that only the selected
+    generator is loaded.
+    """
+
+    if gen_type == GeneratorType.RANDOM:
+        from generators.random_generator import RandomGenerator
+
+        generator = RandomGenerator(
+            pokemon,
+            team_no=params["team_no"],
+            size=params["size"],
+            utypes=params["utypes"],
+            uteam=params["uteam"],
+            weighted=params["weighted"],
+            seed=seed,
+        )
+    elif gen_type == GeneratorType.GENETIC:
+        from generators.genetic_generator import GeneticGenerator
+
+        generator = GeneticGenerator(
+            pokemon,
+            team_no=params["team_no"],
+            size=params["size"],
+            uteam=params["uteam"],
+            weight=params["weight"],
+            gens=params["gens"],
+            prop=params["prop"],
+            teams=params["teams"],
+            cross=params["cross"],
+            mut=params["mut"],
+            time_limit=params["time_limit"],
+            patience=params["patience"],
+            coverage=params["coverage"],
+            seed=seed,
+        )
+    elif gen_type == GeneratorType.GENETIC_ISLANDS:
+        from generators.island_generator import IslandGenerator
+
+        generator = IslandGenerator(
+            pokemon,
+            team_no=params["team_no"],
+            size=params["size"],
+            uteam=params["uteam"],
+            weight=params["weight"],
+            gens=params["gens"],
+            prop=params["prop"],
+            teams=params["teams"],
+            cross=params["cross"],
+            mut=params["mut"],
+            islands=params["islands"],
+            migrate=params["migrate"],
+            time_limit=params["time_limit"],
+            patience=params["patience"],
+            coverage=params["coverage"],
+            seed=seed,
+        )
+    elif gen_type == GeneratorType.EXACT:
+        from generators.exact_generator import ExactGenerator
+
+        generator = ExactGenerator(
+            pokemon,
+            team_no=params["team_no"],
+            size=params["size"],
+            uteam=params["uteam"],
+            weight=params["weight"],
+        )
+    elif gen_type == GeneratorType.NSGA:
+        from generators.nsga_generator import NSGAGenerator
+
+        generator = NSGAGenerator(
+            pokemon,
+            team_no=params["team_no"],
+            size=params["size"],
+            uteam=params["uteam"],
+            weight=params["weight"],
+            gens=params["gens"],
+            teams=params["teams"],
+            mut=params["mut"],
+            time_limit=params["time_limit"],
+            seed=seed,
+        )
+    elif gen_type == GeneratorType.ANNEAL:
+        from generators.anneal_generator import AnnealGenerator
+
+        generator = AnnealGenerator(
+            pokemon,
+            team_no=params["team_no"],
+            size=params["size"],
+            uteam=params["uteam"],
+            weight=params["weight"],
+            moves=params["moves"],
+            temp=params["temp"],
+            cooling=params["cooling"],
+            restarts=params["restarts"],
+            seed=seed,
+        )
+    elif gen_type == GeneratorType.BRANCH_BOUND:
+        from generators.branch_bound_generator import BranchBoundGenerator
+
+        generator = BranchBoundGenerator(
+            pokemon,
+            team_no=params["team_no"],
+            size=params["size"],
+            utypes=params["utypes"],
+            uteam=params["uteam"],
+            weight=params["weight"],
+            coverage=params["coverage"],
+        )
+    else:
+        from generators.naive_generator import NaiveGenerator
+
+        generator = NaiveGenerator(
+            pokemon,
+            team_no=params["team_no"],
+            size=params["size"],
+            weights=params["weights"],
+            utypes=params["utypes"],
+            uteam=params["uteam"],
+            coverage=params["coverage"],
+            chart=chart,
+        )
+
+    return generator
+
+
+def parse_args(argv):
+    """Parses team options, returning None when the help message is printed."""
 
-def main(argv):
     short_options = "h"
     long_options = [
         "help",
@@ -235,12 +619,26 @@ def main(argv):
         "teams=",
         "cross=",
         "mut=",
+        "islands=",
+        "migrate=",
+        "time-limit=",
+        "patience=",
+        "moves=",
+        "temp=",
+        "cooling=",
+        "restarts=",
+        "coverage=",
+        "count=",
+        "output=",
+        "file=",
+        "derive",
         "final",
         "legendary",
         "mythical",
         "ultra",
         "utypes",
         "uteam",
+        "weighted",
         "color",
     ]
     help_message = """usage: run.py [options]
@@ -269,19 +667,33 @@ def main(argv):
         --teams t           Sets genetic teams to 't'. Default: '100'.
         --cross c           Sets genetic crossing to 'c'. Default: '2'.
         --mut m             Sets genetic mutations to 'm'. Default: '3'.
+        --islands i         Sets genetic islands to 'i'. Default: 'None' (cpu_count).
+        --migrate m         Sets genetic island migration interval to 'm'. Default: '5'.
+        --time-limit t      Sets genetic time limit to 't' seconds. Default: 'None'.
+        --patience p        Sets genetic patience to 'p' generations. Default: 'None'.
+        --moves m           Sets annealing moves per restart to 'm'. Default: '10000'.
+        --temp t            Sets annealing start temperature to 't'. Default: '0.01'.
+        --cooling c         Sets annealing cooling to 'c' (EXP/LINEAR/LOG). Default: 'EXP'.
+        --restarts r        Sets annealing restarts to 'r'. Default: '16'.
+        --coverage c        Sets type coverage weight to 'c' (only for NAIVE/GENETIC/GENETIC-ISLANDS, ignored with a warning by BRANCH-BOUND). Default: '0'.
+        --count c           Sets number of teams to 'c'. Default: '1'.
+        --output o          Sets output format to 'o' (ASCII/JSONL). Default: 'ASCII'.
+        --file f            Sets JSONL output file to 'f'. Default: 'None' (stdout).
+        --derive            Computes weaknesses from the type chart.
         --final             Only allow final evolutions.
         --legendary         Don't allow legendary Pokemon.
         --mytical           Don't allow mythical Pokemon.
         --ultra             Don't allow ultra beast Pokemon.
-        --utypes            Enables unique type generation (only for NAIVE/RANDOM).
-        --uteam             Enables unique team generation (only for NAIVE/RANDOM).
+        --utypes            Enables unique type generation (only for NAIVE/RANDOM/BRANCH-BOUND).
+        --uteam             Enables unique team generation (all generators).
+        --weighted          Enables sampling weighted by stat total (only for RANDOM).
         --color             Enables colored output."""
 
     try:
         opts, args = getopt(argv, shortopts=short_options, longopts=long_options)
     except GetoptError:
         print(help_message)
-        return
+        return None
 
     seed = None
     game = Game.SWSH
@@ -310,14 +722,28 @@ def main(argv):
     teams = 100
     cross = 2
     mut = 3
+    islands = None
+    migrate = 5
+    time_limit = None
+    patience = None
+    moves = 10000
+    temp = 0.01
+    cooling = "exp"
+    restarts = 16
+    coverage = 0.0
+    count = 1
+    output = "ascii"
+    file = None
+    derive = False
     utypes = False
     uteam = False
+    weighted = False
     color = False
 
     for opt, arg in opts:
         if opt in ["-h", "--help"]:
             print(help_message)
-            return
+            return None
         elif opt == "--seed":
             seed = int(arg)
         elif opt == "--game":
@@ -353,9 +779,35 @@ def main(argv):
         elif opt == "--stage":
             stage = int(arg)
         elif opt == "--gen":
-            gen_type = GeneratorType[arg.upper()]
+            gen_type = GeneratorType(arg.lower())
         elif opt == "--gens":
             gens = int(arg)
+        elif opt == "--islands":
+            islands = int(arg)
+        elif opt == "--migrate":
+            migrate = int(arg)
+        elif opt == "--time-limit":
+            time_limit = float(arg)
+        elif opt == "--patience":
+            patience = int(arg)
+        elif opt == "--moves":
+            moves = int(arg)
+        elif opt == "--temp":
+            temp = float(arg)
+        elif opt == "--cooling":
+            cooling = arg.lower()
+        elif opt == "--restarts":
+            restarts = int(arg)
+        elif opt == "--coverage":
+            coverage = float(arg)
+        elif opt == "--count":
+            count = int(arg)
+        elif opt == "--output":
+            output = arg.lower()
+        elif opt == "--file":
+            file = arg
+        elif opt == "--derive":
+            derive = True
         elif opt == "--final":
             only_final = True
         elif opt == "--legendary":
@@ -368,18 +820,20 @@ def main(argv):
             utypes = True
         elif opt == "--uteam":
             uteam = True
+        elif opt == "--weighted":
+            weighted = True
         elif opt == "--color":
             color = True
 
     if weights.shape[1] != 6:
         print(help_message)
-        return
+        return None
     elif stage is not None and (stage < 1 or stage > 3):
         print(help_message)
-        return
+        return None
     elif len(team_no) > size:
         print(help_message)
-        return
+        return None
 
     min_stats = {
         Stats.HP: min_hp,
@@ -391,7 +845,7 @@ def main(argv):
         Stats.TOTAL: min_total,
     }
 
-    pokemon = load(game=game, dex=dex)
+    pokemon = load(game=game, dex=dex, derive=derive)
     pokemon = filter_pokemon(
         pokemon,
         min_stats,
@@ -404,40 +858,100 @@ def main(argv):
         allow_ultra=allow_ultra,
     )
 
-    generator = None
-    if gen_type == GeneratorType.RANDOM:
-        generator = RandomGenerator(
-            pokemon, team_no=team_no, size=size, utypes=utypes, uteam=uteam, seed=seed
-        )
-    elif gen_type == GeneratorType.GENETIC:
-        generator = GeneticGenerator(
-            pokemon,
-            team_no=team_no,
-            size=size,
-            uteam=uteam,
-            weight=weight,
-            gens=gens,
-            prop=prop,
-            teams=teams,
-            cross=cross,
-            mut=mut,
-            seed=seed,
-        )
-    else:
-        generator = NaiveGenerator(
-            pokemon,
-            team_no=team_no,
-            size=size,
-            weights=weights,
-            utypes=utypes,
-            uteam=uteam,
+    params = {
+        "team_no": team_no,
+        "size": size,
+        "weights": weights,
+        "weight": weight,
+        "utypes": utypes,
+        "uteam": uteam,
+        "weighted": weighted,
+        "gens": gens,
+        "prop": prop,
+        "teams": teams,
+        "cross": cross,
+        "mut": mut,
+        "islands": islands,
+        "migrate": migrate,
+        "time_limit": time_limit,
+        "patience": patience,
+        "moves": moves,
+        "temp": temp,
+        "cooling": cooling,
+        "restarts": restarts,
+        "coverage": coverage,
+    }
+
+    chart = None
+    if gen_type == GeneratorType.NAIVE:
+        chart = load_type_chart(game=game, dex=dex, derive=derive)
+
+    return {
+        "seed": seed,
+        "game": game,
+        "pokemon": pokemon,
+        "gen_type": gen_type,
+        "params": params,
+        "chart": chart,
+        "count": count,
+        "output": output,
+        "file": file,
+        "color": color,
+    }
+
+
+def main(argv):
+    options = parse_args(argv)
+    if options is None:
+        return
+
+    seed = options["seed"]
+    game = options["game"]
+    pokemon = options["pokemon"]
+    gen_type = options["gen_type"]
+    params = options["params"]
+    chart = options["chart"]
+    count = options["count"]
+    file = options["file"]
+    color = options["color"]
+    team_no = params["team_no"]
+    size = params["size"]
+    uteam = params["uteam"]
+    weight = params["weight"]
+    coverage = params["coverage"]
+
+    if options["output"] == "jsonl":
+        write_teams(
+            pokemon, gen_type, params, count=count, seed=seed, file=file, chart=chart
         )
+        return
 
-    team = generator.generate()
+    optimum = None
+    stochastic = [
+        GeneratorType.GENETIC,
+        GeneratorType.GENETIC_ISLANDS,
+        GeneratorType.ANNEAL,
+    ]
+    if gen_type in stochastic and coverage <= 0:
+        from generators.exact_generator import ExactGenerator
 
-    print_team(game, team, color=color)
-    print("")
-    print_team_statistics(pokemon, team, weight)
+        exact = ExactGenerator(
+            pokemon, team_no=team_no, size=size, uteam=uteam, weight=weight
+        )
+        optimum = exact.optimum()
+
+    _, seeds = get_seeds(seed, count)
+    generator = get_generator(pokemon, gen_type, params, chart=chart)
+    for team_seed in seeds:
+        generator.reseed(team_seed)
+        team = generator.generate()
+
+        print_team(game, team, color=color)
+        print("")
+        print_team_statistics(pokemon, team, weight, optimum=optimum)
+        if gen_type == GeneratorType.NSGA:
+            print("")
+            print_front(get_front(generator))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from generators.generator import GeneratorType
+from pokemon import Game, Dex, Stats
+import sweep
+import team
+import tools
+
+# Galarian forms share the NO of the original form in the ALL table.
+SHARED_NOS = [77, 78, 122, 263, 264, 554, 555]
+GEN_ARGS = ["--gens", "2", "--islands", "2", "--moves", "200", "--restarts", "2"]
+
+
+@pytest.fixture(autouse=True)
+def root_dir(monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+
+def test_all_table_has_shared_numbers():
+    pokemon = team.load(game=Game.SWSH, dex=Dex.ALL)
+    counts = pokemon["no"].value_counts()
+
+    assert all(counts[no] == 2 for no in SHARED_NOS)
+
+
+def test_no_to_idx_takes_first_row():
+    pokemon = team.load(game=Game.SWSH, dex=Dex.ALL)
+    team_idx = tools.no_to_idx(pokemon, SHARED_NOS)
+    nos = pokemon["no"].to_numpy()
+
+    for (no, row) in zip(SHARED_NOS, team_idx):
+        assert row == np.flatnonzero(nos == no)[0]
+
+
+@pytest.mark.parametrize("gen_type", list(GeneratorType))
+def test_pinned_shared_number(gen_type):
+    args = ["--gen", gen_type.value, "--team", "555,77", "--uteam", "--seed", "1"]
+    options = team.parse_args(args + GEN_ARGS)
+    pokemon = options["pokemon"]
+    generator = team.get_generator(
+        pokemon, gen_type, options["params"], seed=1, chart=options["chart"]
+    )
+    pkmns = generator.generate()
+    rows = [p.row for p in pkmns]
+
+    assert [p.no for p in pkmns[:2]] == [555, 77]
+    assert len(rows) == 6
+    assert np.isfinite(tools.fitness(pokemon, rows))
+
+
+def test_write_teams_all_table(tmp_path):
+    options = team.parse_args(["--gen", "random"])
+    file = str(tmp_path / "teams.jsonl")
+    team.write_teams(
+        options["pokemon"],
+        options["gen_type"],
+        options["params"],
+        count=300,
+        seed=1,
+        file=file,
+    )
+    with open(file) as f:
+        records = [json.loads(line) for line in f]
+
+    assert len(records) == 300
+    assert any(no in SHARED_NOS for record in records for no in record["no"])
+
+
+def test_sweep_all_table(tmp_path):
+    options = team.parse_args(["--gen", "random"])
+    file = str(tmp_path / "sweep.jsonl")
+    sweep.sweep(
+        options["pokemon"],
+        options["gen_type"],
+        options["params"],
+        seeds=100,
+        seed=1,
+        workers=1,
+        file=file,
+    )
+    with open(file) as f:
+        records = [json.loads(line) for line in f]
+
+    assert [record["index"] for record in records] == list(range(100))
+    assert any(no in SHARED_NOS for record in records for no in record["no"])
+
+
+def test_missing_dex_file(monkeypatch):
+    monkeypatch.setattr(team, "get_dex_file", lambda game, dex: f"missing/{dex.value}")
+
+    with pytest.raises(FileNotFoundError, match="missing/galar"):
+        team.read_dex(game=Game.SWSH)
+
+
+def test_filter_index_sees_changed_columns():
+    pokemon = team.load(game=Game.SWSH, dex=Dex.ALL)
+    stats = {s: 0 for s in Stats}
+
+    assert len(team.filter_index(pokemon, stats, stage=1)) > 0
+    pokemon.loc[:, "stage"] = 3
+    assert len(team.filter_index(pokemon, stats, stage=1)) == 0
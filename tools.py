@@ -10,30 +10,49 @@ MIN_WEAK = 13
 
 
 def no_to_idx(pokemon, team_no):
-    """Converts NOs to indices."""
+    """Converts NOs to row indices.
 
-    pokemon = pokemon.reset_index(drop=True)
-    unique_team = pokemon[pokemon["no"].isin(team_no)]
-    team_idx = np.zeros((len(team_no),))
+    Forms that share a NO (e.g. Galarian forms) have a row each, and a NO
+    is converted to the first of its rows.
+    """
+
+    nos = pokemon["no"].to_numpy()
+    team_idx = np.zeros((len(team_no),), dtype=int)
     for (i, no) in enumerate(team_no):
-        team_idx[i] = unique_team[unique_team["no"] == no].index.item()
+        rows = np.flatnonzero(nos == no)
+        if len(rows) <= 0:
+            raise ValueError(f"No pokemon with NO {no}.")
+        team_idx[i] = rows[0]
 
     return team_idx
 
 
-def fitness(pokemon, team_no, weight=0.5):
-    """Evaluates fitness for a team."""
-
-    team_idx = no_to_idx(pokemon, team_no)
+def fitness(pokemon, team_idx, weight=0.5):
+    """Evaluates fitness for the team at rows 'team_idx'."""
 
     team = pokemon.iloc[team_idx, :]
-
-    stats = team.iloc[:, STAT_COLS].to_numpy(dtype=float)
-    weaknesses = team.iloc[:, WEAK_COLS].to_numpy(dtype=float)
+    stat_totals, weak_totals = get_totals(team)
 
     n_team = team.shape[0]
-    stat_score = np.mean(np.sum(stats, axis=0))
-    weak_score = np.sum(np.sum(weaknesses, axis=0)) / n_team
+    fit = score(np.sum(stat_totals), np.sum(weak_totals), n_team, weight=weight)
+
+    return fit
+
+
+def get_totals(pokemon):
+    """Returns stat and weakness totals for each pokemon."""
+
+    stats = pokemon.iloc[:, STAT_COLS].to_numpy(dtype=float)
+    weaknesses = pokemon.iloc[:, WEAK_COLS].to_numpy(dtype=float)
+
+    return np.sum(stats, axis=1), np.sum(weaknesses, axis=1)
+
+
+def objectives(stat_total, weak_total, n_team):
+    """Evaluates stat and weakness scores from summed team stats and weaknesses."""
+
+    stat_score = stat_total / len(STAT_COLS)
+    weak_score = weak_total / n_team
 
     stat_score = (stat_score - MIN_STAT) / MAX_STAT
     weak_score = (weak_score - MIN_WEAK) / MAX_WEAK
@@ -43,11 +62,51 @@ def fitness(pokemon, team_no, weight=0.5):
 
     weak_score = 1 - weak_score
 
+    return stat_score, weak_score
+
+
+def score(stat_total, weak_total, n_team, weight=0.5):
+    """Evaluates fitness from summed team stats and weaknesses."""
+
+    stat_score, weak_score = objectives(stat_total, weak_total, n_team)
     fit = weight * stat_score + (1 - weight) * weak_score
 
     return fit
 
 
+def below_caps(stat_totals, weak_totals, n_team):
+    """Checks that no team of 'n_team' pokemon can reach the caps in 'score'.
+
+    Below the caps the team fitness is the sum of its members'
+    contributions, so the best members make up the best team.
+    """
+
+    if len(stat_totals) <= 0:
+        return True
+
+    stat_total = n_team * np.amax(stat_totals)
+    weak_total = n_team * np.amax(weak_totals)
+    stat_score = stat_total / len(STAT_COLS)
+    weak_score = weak_total / n_team
+    stat_score = (stat_score - MIN_STAT) / MAX_STAT
+    weak_score = (weak_score - MIN_WEAK) / MAX_WEAK
+
+    return stat_score <= 1 and weak_score <= 1
+
+
+def contributions(stat_totals, weak_totals, n_team, weight=0.5):
+    """Evaluates each pokemon's contribution to the fitness of a team.
+
+    Below the caps in 'score', the fitness of a team of 'n_team' pokemon is
+    the sum of its members' contributions plus a constant.
+    """
+
+    stat_scores = stat_totals / (len(STAT_COLS) * MAX_STAT)
+    weak_scores = weak_totals / (n_team * MAX_WEAK)
+
+    return weight * stat_scores - (1 - weight) * weak_scores
+
+
 def get_types(pokemon):
     lookup = {}
     types = list(zip(pokemon["type_1"], pokemon["type_2"]))
@@ -56,6 +115,19 @@ def get_types(pokemon):
     return types
 
 
+def get_type_chart(pokemon):
+    """Returns the type pairs in 'pokemon' and the weaknesses of each pair.
+
+    The weaknesses of a pair are taken from its first pokemon.
+    """
+
+    first = pokemon.drop_duplicates(subset=["type_1", "type_2"])
+    pairs = first[["type_1", "type_2"]].to_numpy(dtype=str)
+    weaknesses = first.iloc[:, WEAK_COLS].to_numpy(dtype=float)
+
+    return pairs, weaknesses
+
+
 def frame_to_pokemon(frame):
     if frame is None:
         return None
@@ -79,7 +151,7 @@ def frame_to_pokemon(frame):
     is_legendary = frame["is_legendary"]
     is_mythical = frame["is_mythical"]
     is_ultra = frame["is_ultra"]
-    weaknesses = frame[15:].to_dict()
+    weaknesses = frame.iloc[WEAK_COLS].to_dict()
     
     pokemon = Pokemon(
         no,
@@ -0,0 +1,127 @@
+import pandas as pd
+import numpy as np
+import tools
+
+TYPES = (
+    "normal",
+    "fire",
+    "water",
+    "electric",
+    "grass",
+    "ice",
+    "fighting",
+    "poison",
+    "ground",
+    "flying",
+    "psychic",
+    "bug",
+    "rock",
+    "ghost",
+    "dragon",
+    "dark",
+    "steel",
+    "fairy",
+)
+TYPE_IDX = {t: i for (i, t) in enumerate(TYPES)}
+# Type columns are categorical, with an empty string for no second type.
+TYPE_DTYPE = pd.CategoricalDtype(list(TYPES) + [""])
+
+# Damage multipliers with attacking types as rows and defending types as
+# columns, in the order of 'TYPES'.
+_ = 1.0
+H = 0.5
+X = 2.0
+O = 0.0
+CHART = np.array(
+    [
+        # nor fir wat ele gra ice fig poi gro fly psy bug roc gho dra dar ste fai
+        [_, _, _, _, _, _, _, _, _, _, _, _, H, O, _, _, H, _],  # normal
+        [_, H, H, _, X, X, _, _, _, _, _, X, H, _, H, _, X, _],  # fire
+        [_, X, H, _, H, _, _, _, X, _, _, _, X, _, H, _, _, _],  # water
+        [_, _, X, H, H, _, _, _, O, X, _, _, _, _, H, _, _, _],  # electric
+        [_, H, X, _, H, _, _, H, X, H, _, H, X, _, H, _, H, _],  # grass
+        [_, H, H, _, X, H, _, _, X, X, _, _, _, _, X, _, H, _],  # ice
+        [X, _, _, _, _, X, _, H, _, H, H, H, X, O, _, X, X, H],  # fighting
+        [_, _, _, _, X, _, _, H, H, _, _, _, H, H, _, _, O, X],  # poison
+        [_, X, _, X, H, _, _, X, _, O, _, H, X, _, _, _, X, _],  # ground
+        [_, _, _, H, X, _, X, _, _, _, _, X, H, _, _, _, H, _],  # flying
+        [_, _, _, _, _, _, X, X, _, _, H, _, _, _, _, O, H, _],  # psychic
+        [_, H, _, _, X, _, H, H, _, H, X, _, _, H, _, X, H, H],  # bug
+        [_, X, _, _, _, X, H, _, H, X, _, X, _, _, _, _, H, _],  # rock
+        [O, _, _, _, _, _, _, _, _, _, X, _, _, X, _, H, _, _],  # ghost
+        [_, _, _, _, _, _, _, _, _, _, _, _, _, _, X, _, H, O],  # dragon
+        [_, _, _, _, _, _, H, _, _, _, X, _, _, X, _, H, _, H],  # dark
+        [_, H, H, H, _, X, _, _, _, _, _, _, X, _, _, _, H, X],  # steel
+        [_, H, _, _, _, _, X, H, _, _, _, _, _, _, X, X, H, _],  # fairy
+    ]
+)
+del _, H, X, O
+
+
+def to_codes(types):
+    """Converts type names to chart indices, with -1 for no type.
+
+    Columns of 'TYPE_DTYPE' already hold the indices as category codes.
+    """
+
+    if isinstance(types, pd.Series) and types.dtype == TYPE_DTYPE:
+        codes = types.cat.codes.to_numpy()
+    else:
+        codes = pd.Categorical(types, dtype=TYPE_DTYPE).codes
+    codes = codes.astype(int)
+
+    return np.where(codes < len(TYPES), codes, -1)
+
+
+def pair_codes(type_1, type_2):
+    """Converts type pairs to integer codes."""
+
+    return to_codes(type_1) * (len(TYPES) + 1) + to_codes(type_2) + 1
+
+
+def profiles(type_1, type_2):
+    """Returns the multiplier of each attacking type against each type pair.
+
+    'type_1' and 'type_2' are type names, where an empty second type is a
+    single-type pokemon. The result has one row per pair.
+    """
+
+    codes_1 = to_codes(type_1)
+    codes_2 = to_codes(type_2)
+    defending = CHART.T
+    multipliers = defending[codes_1]
+    single = codes_2 < 0
+    multipliers = multipliers * np.where(
+        single.reshape((-1, 1)), 1.0, defending[np.maximum(codes_2, 0)]
+    )
+
+    return multipliers
+
+
+def profile(type_1, type_2=""):
+    """Returns the multiplier of each attacking type against a type pair."""
+
+    return profiles([type_1], [type_2])[0]
+
+
+def derive(pokemon):
+    """Returns a copy of 'pokemon' with weaknesses computed from the types."""
+
+    pokemon = pokemon.copy()
+    multipliers = profiles(pokemon["type_1"], pokemon["type_2"])
+    for (i, t) in enumerate(TYPES):
+        pokemon[t] = multipliers[:, i]
+
+    return pokemon
+
+
+def check(pokemon):
+    """Returns the pokemon whose weaknesses differ from their types.
+
+    Differences usually come from abilities such as Levitate.
+    """
+
+    derived = profiles(pokemon["type_1"], pokemon["type_2"])
+    scraped = pokemon.iloc[:, tools.WEAK_COLS].to_numpy(dtype=float)
+
+    return pokemon[np.any(derived != scraped, axis=1)]
@@ -0,0 +1,80 @@
+import numpy as np
+import tools
+
+N_TYPES = len(tools.WEAK_COLS)
+TYPE_BITS = 1 << np.arange(N_TYPES, dtype=np.int64)
+
+
+class TypeCoverage:
+    def __init__(self, pokemon):
+        self.types = list(pokemon.columns[tools.WEAK_COLS])
+        self.matrix = pokemon.iloc[:, tools.WEAK_COLS].to_numpy(dtype=np.float32).T
+        self.resists = to_bits(self.matrix < 1)
+        self.weaknesses = to_bits(self.matrix > 1)
+
+    def best(self, teams):
+        """Returns the lowest multiplier of each attacking type for each team."""
+
+        return np.amin(self.matrix.T[teams], axis=1)
+
+    def worst(self, teams):
+        """Returns the highest multiplier of each attacking type for each team."""
+
+        return np.amax(self.matrix.T[teams], axis=1)
+
+    def resisted(self, teams, base=0):
+        """Returns bitmasks of the attacking types resisted by each team."""
+
+        return resisted(self.resists, teams, base=base)
+
+    def exposed(self, teams):
+        """Returns bitmasks of unresisted attacking types a member is weak to."""
+
+        weak = np.bitwise_or.reduce(self.weaknesses[teams], axis=1)
+
+        return weak & ~self.resisted(teams)
+
+    def score(self, teams, base=0):
+        """Returns the share of attacking types resisted by each team."""
+
+        return score(self.resists, teams, base=base)
+
+    def names(self, bits):
+        """Returns the attacking types in a bitmask."""
+
+        return [t for (t, bit) in zip(self.types, TYPE_BITS) if bits & bit]
+
+
+def to_bits(mask):
+    """Converts a (types, pokemon) boolean matrix to a bitmask per pokemon."""
+
+    return np.sum(mask.T * TYPE_BITS, axis=1)
+
+
+def resisted(resists, teams, base=0):
+    """Returns bitmasks of the attacking types resisted by each team.
+
+    'base' holds the types resisted by fixed team members.
+    """
+
+    return np.bitwise_or.reduce(resists[teams], axis=1) | base
+
+
+def score(resists, teams, base=0):
+    """Returns the share of attacking types resisted by each team."""
+
+    return count(resisted(resists, teams, base=base)) / N_TYPES
+
+
+def count(bits):
+    """Counts the set bits of type bitmasks."""
+
+    bits = np.asarray(bits, dtype=np.int64)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bits)
+
+    counts = np.zeros(bits.shape, dtype=np.int64)
+    for bit in TYPE_BITS:
+        counts += (bits & bit) > 0
+
+    return counts